@@ -0,0 +1,175 @@
+import argparse, json, os, platform, sys, tempfile, time
+
+from simulation.circuit import Circuit
+from utils.geometry import connection_buffers
+
+# Synthetic circuits are built as save data (the same lists Game.save writes), so every shape
+# goes through the real loader and none of them need a window.
+
+GATE_WIDTH = 184 # logic_gate_true.png
+
+def chain_circuit(size):
+    # INPUT -> NOT -> NOT -> ... -> OUTPUT
+    data = [[0, 0, 0, "INPUT", 1, [], 1 if size > 1 else None]]
+
+    for gate_id in range(1, size):
+        gate_type = "OUTPUT" if gate_id == size - 1 else "NOT"
+        data.append([gate_id, gate_id * 250, (gate_id % 20) * 50, gate_type, None, [gate_id - 1], gate_id + 1 if gate_id < size - 1 else None])
+
+    return data
+
+def tree_circuit(size):
+    # balanced XOR tree over size // 2 INPUTs, reduced pairwise into 1 OUTPUT
+    data = []
+    level = []
+
+    for gate_id in range(max(2, size // 2)):
+        data.append([gate_id, 0, gate_id * 50, "INPUT", gate_id % 2, [], None])
+        level.append(gate_id)
+
+    depth = 1
+    while len(level) > 1:
+        next_level = []
+
+        for i in range(0, len(level) - 1, 2):
+            gate_id = len(data)
+            data.append([gate_id, depth * 250, i * 50, "XOR", None, [level[i], level[i + 1]], None])
+            data[level[i]][6] = data[level[i + 1]][6] = gate_id
+            next_level.append(gate_id)
+
+        if len(level) % 2:
+            next_level.append(level[-1])
+
+        level = next_level
+        depth += 1
+
+    data.append([len(data), depth * 250, 0, "OUTPUT", None, [level[0]], None])
+    data[level[0]][6] = len(data) - 1
+
+    return data
+
+def wide_circuit(size):
+    # size - 2 INPUTs feeding 1 OR gate, like a DIY board with a huge fan-in
+    input_count = max(2, size - 2)
+    data = [[gate_id, 0, gate_id * 50, "INPUT", gate_id % 2, [], input_count] for gate_id in range(input_count)]
+
+    data.append([input_count, 1000, 0, "OR", None, list(range(input_count)), input_count + 1])
+    data.append([input_count + 1, 1250, 0, "OUTPUT", None, [input_count], None])
+
+    return data
+
+CIRCUITS = {
+    "chain": chain_circuit,
+    "tree": tree_circuit,
+    "wide": wide_circuit,
+}
+
+def best_time(func, repeat):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def wire_geometry(circuit):
+    gates = circuit.gates
+    ports = [((gates[output_id].x + GATE_WIDTH / 2, gates[output_id].y), (gates[input_id].x - GATE_WIDTH / 2, gates[input_id].y)) for output_id, input_id in circuit.connections]
+
+    connection_buffers(ports, segments=100)
+
+def run_case(shape, size, directory):
+    data = CIRCUITS[shape](size)
+    repeat = max(1, min(5, 100_000 // size))
+    results = {}
+
+    circuit = Circuit.from_save_data(data)
+    input_id = next(gate.id for gate in circuit.gates if gate.gate_type == "INPUT")
+
+    def compile_netlist():
+        circuit.netlist_dirty = True
+        circuit.get_netlist()
+
+    def toggle():
+        circuit.set_input(input_id, not circuit.gates[input_id].value)
+
+    results["compile"] = best_time(compile_netlist, repeat)
+    results["evaluate"] = best_time(circuit.evaluate, repeat)
+    results["toggle"] = best_time(toggle, repeat)
+    results["geometry"] = best_time(lambda: wire_geometry(circuit), repeat)
+
+    path = os.path.join(directory, f"{shape}-{size}-save.json")
+    results["save"] = best_time(lambda: circuit.save(path), repeat)
+    results["load"] = best_time(lambda: Circuit.load(path), repeat)
+
+    binary_path = os.path.join(directory, f"{shape}-{size}-save.bin")
+    results["save_binary"] = best_time(lambda: circuit.save(binary_path), repeat)
+    results["load_binary"] = best_time(lambda: Circuit.load(binary_path), repeat)
+
+    return {f"{shape}/{size}/{name}": seconds for name, seconds in results.items()}
+
+def run(shapes, sizes):
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in shapes:
+            for size in sizes:
+                case_results = run_case(shape, size, directory)
+                results.update(case_results)
+
+                for name, seconds in case_results.items():
+                    print(f"{name:<32} {seconds * 1000:12.3f} ms", file=sys.stderr)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+def compare(results, baseline, threshold, min_delta=0.001):
+    # returns the benchmarks that got slower than baseline by more than threshold (0.2 = 20%),
+    # differences under min_delta seconds are timer noise on the tiny circuits
+    regressions = []
+
+    for name, seconds in results["results"].items():
+        baseline_seconds = baseline["results"].get(name)
+        if baseline_seconds is None:
+            continue
+
+        if seconds > baseline_seconds * (1 + threshold) and seconds - baseline_seconds > min_delta:
+            regressions.append((name, baseline_seconds, seconds))
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench", description="Times evaluation, wire geometry and save/load on synthetic circuits.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000, 1_000_000], help="gate counts to build each circuit with")
+    parser.add_argument("--shapes", nargs="+", choices=list(CIRCUITS), default=list(CIRCUITS))
+    parser.add_argument("--output", default="bench_results.json", help="where to write the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown against the baseline, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    results = run(args.shapes, args.sizes)
+
+    with open(args.output, "w") as file:
+        file.write(json.dumps(results, indent=4))
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+
+        for name, baseline_seconds, seconds in regressions:
+            print(f"REGRESSION {name}: {baseline_seconds * 1000:.3f} ms -> {seconds * 1000:.3f} ms ({seconds / baseline_seconds:.2f}x)", file=sys.stderr)
+
+        if regressions:
+            sys.exit(1)
+
+        print(f"No regressions against {args.compare}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import csv, time
+
+from array import array
+
+PHASES = ("update", "culling", "sprites", "wires", "preview", "ui")
+COUNTERS = ("evaluations", "propagations", "changed_gates")
+
+class FrameStats:
+    # per-phase times (in ms) and simulation counts of the last capacity frames, in preallocated ring buffers.
+    # every mark ends the phase that started at begin or at the previous mark
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.columns = ("interval", "frame") + PHASES + COUNTERS
+        self.buffers = {column: array("d", bytes(8 * capacity)) for column in self.columns}
+        self.index = 0 # the slot end_frame writes next
+        self.count = 0
+
+        self.current = dict.fromkeys(self.columns, 0.0)
+        self.last = time.perf_counter()
+
+    def begin(self):
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += (now - self.last) * 1000
+        self.last = now
+
+    def add(self, counter, amount=1):
+        self.current[counter] += amount
+
+    def end_frame(self, interval):
+        current = self.current
+        current["interval"] = interval * 1000
+        current["frame"] = sum(current[phase] for phase in PHASES)
+
+        for column, value in current.items():
+            self.buffers[column][self.index] = value
+            current[column] = 0.0
+
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def values(self, column):
+        # oldest first
+        buffer = self.buffers[column]
+
+        if self.count < self.capacity:
+            return buffer[:self.count]
+
+        return buffer[self.index:] + buffer[:self.index]
+
+    def percentile(self, column, percent):
+        values = sorted(self.values(column))
+        if not values:
+            return 0.0
+
+        return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+    def mean(self, column):
+        return sum(self.buffers[column][:self.count]) / self.count if self.count else 0.0
+
+    def summary(self):
+        frame = " / ".join(f"{self.percentile('frame', percent):.2f}" for percent in (50, 95, 99))
+        interval = self.mean("interval")
+        phases = "\n".join(f"{phase}: {self.mean(phase):.2f} ms" for phase in PHASES)
+        counters = ", ".join(f"{self.mean(counter):.1f} {counter.replace('_', ' ')}" for counter in COUNTERS)
+
+        return f"{1000 / interval if interval else 0:.0f} FPS, frame p50/p95/p99 {frame} ms\n{phases}\nper frame: {counters}"
+
+    def write_csv(self, path):
+        columns = [self.values(column) for column in self.columns]
+
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(self.columns)
+            writer.writerows([round(value, 3) for value in row] for row in zip(*columns))
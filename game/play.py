@@ -1,67 +1,97 @@
-import arcade, arcade.gui, random, datetime, os, json
+import arcade, arcade.gui, random, datetime, os, json, logging, math, PIL.Image, PIL.ImageOps
 
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from utils.utils import cubic_bezier_points, get_gate_port_position, generate_task_text, multi_gate
-from utils.constants import button_style, LOGICAL_GATES, LEVELS, SINGLE_INPUT_LOGICAL_GATES
+from utils.utils import generate_task_text
+from utils.geometry import connection_points, cubic_bezier_buffers, bezier_segment_count, connection_curve, get_gate_port_position, polyline_distance, SpatialHash
+from utils.constants import button_style, log_dir, save_dir, recovery_dir, undo_memory_budget, LOGICAL_GATES, LEVELS, SINGLE_INPUT_LOGICAL_GATES
 from utils.preload import button_texture, button_hovered_texture, logic_gate_textures
 
+from game.wires import WireLayer
+from game.frame_stats import FrameStats
+
+from simulation.circuit import Circuit, Gate
+from simulation.journal import Journal
+from simulation.history import History
+from simulation.save_index import SaveIndex
+from simulation.truth_table import TruthTable
+
+WIRE_PICK_DISTANCE = 5 # how close a right click has to be to a wire to remove it
+STRAIGHT_WIRE_ZOOM = 0.15 # zoomed out further than this, wires are drawn as straight lines
+LOAD_PAGE_SIZE = 6 # saves per page of the Load dialog
+FRAME_STATS_FRAMES = 600 # frames kept for the F3 overlay and its CSV export
+FRAME_STATS_REFRESH = 0.5 # seconds between updates of the overlay's text
+TRUTH_TABLE_MAX_INPUTS = 20 # the exported CSV has 2^inputs rows
+
+def write_screenshot(data, size, path):
+    image = PIL.Image.frombytes("RGBA", size, data)
+    PIL.ImageOps.flip(image).save(path)
+
 class LogicalGate(arcade.Sprite):
-    def __init__(self, id, x, y, gate_type):
-        super().__init__(center_x=x, center_y=y, img=logic_gate_textures[gate_type][0])
+    def __init__(self, gate: Gate):
+        super().__init__(center_x=gate.x, center_y=gate.y, img=logic_gate_textures[gate.gate_type][gate.value if gate.value is not None else 0])
 
-        self.id = id
-        self.gate_type = gate_type
-        self.value = None
-        
-        self.input: list[LogicalGate] = []
-        self.output: LogicalGate | None = None
+        self.gate = gate
 
-        self.calculate_value()
+    @property
+    def id(self):
+        return self.gate.id
 
-    def calculate_value(self):
-        if self.gate_type == "OUTPUT" and self.input:
-            self.value = self.input[0].calculate_value()
+    @property
+    def gate_type(self):
+        return self.gate.gate_type
 
-        elif self.gate_type == "INPUT": # dont set INPUT to None
-            pass
-        elif self.gate_type in SINGLE_INPUT_LOGICAL_GATES and len(self.input) == 1:
-            if self.input[0].value is not None:
-                self.value = int(LOGICAL_GATES[self.gate_type](self.input[0].calculate_value()))
-            else:
-                self.value = None
-        elif len(self.input) > 1:
-            if len(self.input) == 2:
-                value = LOGICAL_GATES[self.gate_type](self.input[0].calculate_value(), self.input[1].calculate_value())
-                self.value = int(value) if value is not None else value # have to convert to int cause it might return boolean
-            else:
-                self.value = multi_gate([input.calculate_value() for input in self.input], LOGICAL_GATES[self.gate_type])
-        else:
-            self.value = None
+    @property
+    def value(self):
+        return self.gate.value
 
+    def update_texture(self):
         self.texture = logic_gate_textures[self.gate_type][self.value if self.value is not None else 0]
-        return self.value
-        
+
     def __repr__(self):
-        return f"{self.gate_type}: {self.value}"
+        return repr(self.gate)
 
 class Game(arcade.gui.UIView):
-    def __init__(self, pypresence_client, level_num):
+    def __init__(self, pypresence_client, level_num, circuit=None):
         super().__init__()
 
         self.camera = arcade.Camera2D()
         self.camera.match_window()
 
-        self.spritelist = arcade.SpriteList()
+        self.spritelist = arcade.SpriteList() # only the gates in view, see update_visible
+        self.visible_gates = []
 
         self.pypresence_client = pypresence_client
         self.pypresence_client.update(state="In game")
 
         self.level_num = level_num
 
-        self.gates: list[LogicalGate | arcade.gui.UIInputText] = []
-        self.connections = []
-        self.bezier_points = []
+        self.circuit = Circuit()
+
+        self.gates: list[LogicalGate | arcade.gui.UIInputText] = [] # views of self.circuit.gates, with the same ids
+        self.labels: list[arcade.gui.UIInputText] = []
+        self.wire_buffers = {} # (output id, input id) -> float32 x, y buffer of the wire, only recomputed after one of its gates moved
+        self.dirty_wires = set() # wires whose curve has to be generated again
+        self.wire_index = SpatialHash(cell_size=256) # (output id, input id) -> bounds of the wire, for culling and right click picking
+        self.wire_layers = {} # segment count -> WireLayer with every wire drawn with that many segments
+        self.wire_segments = {} # wire -> (segment count, wire scale it was picked for)
+        self.wire_scale = 1
+        self.gate_index = SpatialHash(cell_size=256) # gate id -> rect, for picking gates under the mouse
+        self.view_bounds = None # what update_visible last culled against, it only culls again once these change
+        self.view_dirty = True # or a gate or wire moved
+
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer") # saves, screenshots and save thumbnails are written here, one at a time
+        self.pending_writes = [] # (future, function called on the UI thread once it's written)
+
+        self.journal = Journal(recovery_dir, submit=self.writer.submit) # every edit, so the session can be recovered after a crash
+        self.journal_failed = False
+        self.history = History(memory_budget=undo_memory_budget)
+        self.save_index = SaveIndex(save_dir, submit=self.writer.submit) # loaded once, refreshed from file mtimes when the Load dialog opens
+
+        self.frame_stats = FrameStats(FRAME_STATS_FRAMES) # always recorded, so an export covers the frames before it
+        self.frame_interval = 0
+        self.frame_stats_refresh = 0
 
         self.default_gate_type = "AND"
         self.dragged_gate = None
@@ -72,9 +102,12 @@ class Game(arcade.gui.UIView):
         self.anchor = self.add_widget(arcade.gui.UIAnchorLayout(size_hint=(1, 1)))
         self.tools_box = self.anchor.add(arcade.gui.UIBoxLayout(space_between=5), anchor_x="right", anchor_y="center", align_x=-10)
 
+        self.frame_stats_label = self.anchor.add(arcade.gui.UILabel(text="", font_size=12, multiline=True, width=self.window.width / 4, height=self.window.height / 6), anchor_x="left", anchor_y="bottom", align_x=10, align_y=10)
+        self.frame_stats_label.visible = False
+
         if not level_num == -1:
             self.task_label = self.anchor.add(arcade.gui.UILabel(text=generate_task_text(LEVELS[level_num]), font_size=20, multiline=True), anchor_x="center", anchor_y="top", align_y=-15)
-            for requirement in LEVELS[level_num]:
+            for requirement in (LEVELS[level_num] if circuit is None else []): # a recovered circuit already has its gates
                 if requirement[1] == "INPUT":
                     for _ in range(requirement[0]):
                         self.add_gate(random.randint(50, 200), random.randint(200, self.window.height - 100), "INPUT")
@@ -106,6 +139,9 @@ class Game(arcade.gui.UIView):
             load_button = self.tools_box.add(arcade.gui.UITextureButton(width=self.window.width * 0.125, height=self.window.height * 0.05, text="Load", style=button_style, texture=button_texture, texture_hovered=button_hovered_texture))
             load_button.on_click = lambda event: self.show_load_ui()
 
+            truth_table_button = self.tools_box.add(arcade.gui.UITextureButton(width=self.window.width * 0.125, height=self.window.height * 0.05, text="Truth Table", style=button_style, texture=button_texture, texture_hovered=button_hovered_texture))
+            truth_table_button.on_click = lambda event: self.export_truth_table()
+
         save_button = self.tools_box.add(arcade.gui.UITextureButton(width=self.window.width * 0.125, height=self.window.height * 0.05, text="Save", style=button_style, texture=button_texture, texture_hovered=button_hovered_texture))
         save_button.on_click = lambda event: self.save()
 
@@ -127,29 +163,92 @@ class Game(arcade.gui.UIView):
 
         self.ui.on_event = self.on_event
 
+        if circuit is not None:
+            self.set_circuit(circuit)
+
+        self.history.clear() # the gates a level starts with can't be undone
+        self.journal.start(self.circuit, level_num)
+
     def save(self):
         now = datetime.now()
         timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
 
-        data = []
-
         for gate in self.gates:
-            if gate.gate_type != "LABEL":
-                data.append([gate.id, gate.center_x, gate.center_y, gate.gate_type, gate.value, [input_gate.id for input_gate in gate.input], gate.output.id if gate.output else None])
-            else:
-                data.append([gate.id, gate.center_x, gate.center_y, gate.gate_type, gate.text])
+            if gate.gate_type == "LABEL":
+                gate.gate.text = gate.text
 
-        with open(f"saves/{timestamp}-save.json", "w") as file:
-            file.write(json.dumps(data, indent=4))
+        snapshot = self.circuit.snapshot()
 
+        self.write_in_background(lambda path: snapshot.save(path, self.level_num), f"saves/{timestamp}-save.bin", lambda: self.show_message(
+            "Save successful.",
+            f"Level was succesfully saved as {timestamp}-save.bin in the current directory!"
+        ))
+
+    def write_in_background(self, func, path, on_done):
+        self.pending_writes.append((self.writer.submit(func, path), path, on_done))
+
+    def show_message(self, title, message_text):
         self.add_widget(arcade.gui.UIMessageBox(
             width=self.window.width / 2,
             height=self.window.height / 2,
-            message_text=f"Level was succesfully saved as {timestamp}-save.json in the current directory!",
-            title="Save successful.",
+            message_text=message_text,
+            title=title,
             buttons=("OK",)
         ))
 
+    def on_update(self, delta_time):
+        self.frame_stats.begin()
+        self.frame_interval = delta_time
+
+        for label in self.labels:
+            if label.text != label.gate.text:
+                label.gate.text = label.text
+                self.journal.record("label", label.id, label.text)
+
+        self.journal.tick(self.circuit)
+
+        for error in self.journal.errors():
+            logging.error(f"Writing the recovery journal failed: {error!r}")
+
+            if not self.journal_failed: # once, a full disk would fail every flush
+                self.journal_failed = True
+                self.show_message("Write failed.", f"Couldn't write the recovery journal, a crash now might lose edits: {error}")
+
+        for pending_write in [pending_write for pending_write in self.pending_writes if pending_write[0].done()]:
+            self.pending_writes.remove(pending_write)
+            future, path, on_done = pending_write
+
+            if future.exception() is not None:
+                logging.error(f"Writing {path} failed: {future.exception()!r}")
+                self.show_message("Write failed.", f"Couldn't write {path}: {future.exception()}")
+            else:
+                on_done()
+
+        if self.save_index.pending and self.save_index.poll() and hasattr(self, "load_ui_box"):
+            self.show_load_page(self.load_page) # thumbnails finished in the background
+
+        if self.frame_stats_label.visible:
+            self.frame_stats_refresh -= delta_time
+            if self.frame_stats_refresh <= 0:
+                self.frame_stats_refresh = FRAME_STATS_REFRESH
+                self.frame_stats_label.text = self.frame_stats.summary()
+
+        self.frame_stats.mark("update")
+
+    def toggle_frame_stats(self):
+        self.frame_stats_label.visible = not self.frame_stats_label.visible
+        self.frame_stats_refresh = 0
+        self.ui._requires_render = True
+
+    def export_frame_stats(self):
+        now = datetime.now()
+        timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(log_dir, f"frame-stats-{timestamp}.csv")
+
+        self.frame_stats.write_csv(path)
+
+        self.show_message("Frame stats exported.", f"The last {self.frame_stats.count} frames were saved as {path}, add it to performance reports!")
+
     def close_load_ui(self):
         self.anchor.remove(self.load_ui_box)
         del self.load_ui_box
@@ -157,81 +256,134 @@ class Game(arcade.gui.UIView):
         self.ui._requires_render = True # for some reason, it doesn't automatically mark it as render required?
 
     def show_load_ui(self):
+        self.save_index.refresh()
+
         self.load_ui_box = self.anchor.add(arcade.gui.UIBoxLayout(size_hint=(0.75, 0.75), space_between=5).with_background(color=arcade.color.DARK_GRAY), anchor_x="center", anchor_y="center", align_x=-self.window.width / 12)
         
         self.load_ui_box.add(arcade.gui.UILabel(text="Pick save to load", font_size=28, text_color=arcade.color.BLACK))
 
-        for save_filename in os.listdir("saves"):
-            button = self.load_ui_box.add(arcade.gui.UITextureButton(text=save_filename, style=button_style, texture=button_texture, texture_hovered=button_hovered_texture, width=self.window.width / 2, height=self.window.height / 20))
-            button.on_click = lambda event, save_filename=save_filename: self.load(save_filename)
+        self.load_rows_box = self.load_ui_box.add(arcade.gui.UIBoxLayout(space_between=5))
+
+        page_box = self.load_ui_box.add(arcade.gui.UIBoxLayout(vertical=False, space_between=5))
+        previous_button = page_box.add(arcade.gui.UITextureButton(text="<", style=button_style, texture=button_texture, texture_hovered=button_hovered_texture, width=self.window.width / 16, height=self.window.height / 20))
+        previous_button.on_click = lambda event: self.show_load_page(self.load_page - 1)
+        self.load_page_label = page_box.add(arcade.gui.UILabel(text="", font_size=16, text_color=arcade.color.BLACK, width=self.window.width / 8, align="center"))
+        next_button = page_box.add(arcade.gui.UITextureButton(text=">", style=button_style, texture=button_texture, texture_hovered=button_hovered_texture, width=self.window.width / 16, height=self.window.height / 20))
+        next_button.on_click = lambda event: self.show_load_page(self.load_page + 1)
 
         close_button = self.load_ui_box.add(arcade.gui.UITextureButton(text="Close", style=button_style, texture=button_texture, texture_hovered=button_hovered_texture, width=self.window.width / 2, height=self.window.height / 20))
         close_button.on_click = lambda event: self.close_load_ui()
 
-    def load(self, save_filename):
-        self.gates.clear()
+        self.show_load_page(0)
 
-        [self.ui.remove(gate) for gate in self.gates if gate.gate_type == "LABEL"]
+    def show_load_page(self, page):
+        # only the rows of one page are widgets, and only their saves get indexed if they aren't yet
+        page_count = self.save_index.page_count(LOAD_PAGE_SIZE)
+        self.load_page = min(max(page, 0), page_count - 1)
+        self.load_page_label.text = f"{self.load_page + 1}/{page_count}"
 
-        self.spritelist.clear()
-        self.connections.clear()
+        self.load_rows_box.clear()
 
-        with open(f"saves/{save_filename}", "r") as file:
-            data = json.load(file)
+        row_height = self.window.height / 16
 
-        for gate in data:
-            if gate[3] != "LABEL":
-                sprite = LogicalGate(gate[0], gate[1], gate[2], gate[3])
-                sprite.value = gate[4]
-                sprite.input = gate[5]
-                sprite.output = gate[6]
+        for save_filename, entry in self.save_index.page(self.load_page, LOAD_PAGE_SIZE):
+            row = self.load_rows_box.add(arcade.gui.UIBoxLayout(vertical=False, space_between=5))
 
-                self.gates.append(sprite)
-                self.spritelist.append(sprite)
+            if entry["thumbnail"] and os.path.exists(entry["thumbnail"]):
+                row.add(arcade.gui.UIImage(texture=arcade.Texture(PIL.Image.open(entry["thumbnail"]).convert("RGBA")), width=row_height * 16 / 9, height=row_height))
             else:
-                label = self.add_widget(arcade.gui.UIInputText(text=gate[4], x=gate[1], y=gate[2], font_name="Roboto", width=self.window.width / 10, height=self.window.height / 30))
-                self.gates.append(label)
-                label.id = gate[0]
-                label.gate_type = "LABEL"
-
-        for gate_cls in self.gates:
-            if gate_cls.gate_type != "LABEL":
-                gate_cls.input = [self.gates[input_id] for input_id in gate_cls.input]
-                gate_cls.output = self.gates[gate_cls.output] if gate_cls.output else None
-
-        for gate_x in self.gates:
-            if gate_x.gate_type == "LABEL":
-                continue
-
-            for gate_y in self.gates:
-                if gate_x == gate_y or gate_y.gate_type == "LABEL":
-                    continue
-            
-                if gate_x in gate_y.input:
-                    self.connections.append([gate_x.id, gate_y.id])
+                row.add(arcade.gui.UISpace(width=row_height * 16 / 9, height=row_height))
 
-        self.evaluate()
+            if entry["error"]:
+                details = "unreadable"
+            else:
+                level = "DIY" if entry["level"] == -1 else ("?" if entry["level"] is None else f"Level {entry['level'] + 1}")
+                gates = "?" if entry["gates"] is None else entry["gates"] # until the save is loaded in the background
+                details = f"{level}, {gates} gates, {datetime.fromtimestamp(entry['mtime']).strftime('%Y-%m-%d %H:%M')}"
+
+            button = row.add(arcade.gui.UITextureButton(text=f"{save_filename} ({details})", style=button_style, texture=button_texture, texture_hovered=button_hovered_texture, width=self.window.width / 2, height=row_height))
+            button.disabled = bool(entry["error"])
+            button.on_click = lambda event, save_filename=save_filename: self.load(save_filename)
+
+        self.save_index.save()
+        self.ui._requires_render = True
+
+    def load(self, save_filename):
+        self.set_circuit(Circuit.load(os.path.join(save_dir, save_filename), evaluate=True)) # stored values can be stale, older or hand-edited saves
+        self.history.clear()
+        self.journal.start(self.circuit, self.level_num)
 
         self.close_load_ui()
 
+    def set_circuit(self, circuit):
+        [self.ui.remove(gate) for gate in self.gates if gate.gate_type == "LABEL"]
+
+        self.gates.clear()
+        self.gate_index.clear()
+        self.spritelist.clear()
+        self.visible_gates = []
+        self.labels.clear()
+        self.wire_buffers.clear()
+        self.dirty_wires.clear()
+        self.wire_index.clear()
+        self.wire_segments.clear()
+        for wire_layer in self.wire_layers.values():
+            wire_layer.clear()
+        self.view_dirty = True
+
+        self.circuit = circuit
+
+        for gate in self.circuit.gates:
+            self.add_gate_view(gate)
+
+        for output_id, input_id in self.circuit.connections:
+            self.invalidate_wire((output_id, input_id))
+
+        self.check_level()
+
     def screenshot(self):
+        frame_stats_visible = self.frame_stats_label.visible
         self.tools_box.visible = False
+        self.frame_stats_label.visible = False
         self.tools_box._requires_render = True
-        self.on_draw()
 
-        image = arcade.get_image()
+        current = dict(self.frame_stats.current) # the forced draw isn't a frame, the time it took is dropped again
+        self.on_draw(end_frame=False)
+        self.frame_stats.current.update(current)
+
+        # only the framebuffer is read here, flipping and PNG encoding happen on the writer thread
+        width, height = int(self.window.width * self.window.get_pixel_ratio()), int(self.window.height * self.window.get_pixel_ratio())
+        data = self.window.ctx.screen.read(viewport=(0, 0, width, height), components=4)
+
+        self.tools_box.visible = True
+        self.frame_stats_label.visible = frame_stats_visible
+
         now = datetime.now()
         timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
-        image.save(f"{timestamp}.png")
 
-        self.tools_box.visible = True
+        self.write_in_background(lambda path: write_screenshot(data, (width, height), path), f"{timestamp}.png", lambda: self.show_message(
+            "Screenshot successful.",
+            f"Screenshot was succesfully saved as {timestamp}.png in the current directory!"
+        ))
 
-        self.add_widget(arcade.gui.UIMessageBox(
-            width=self.window.width / 2,
-            height=self.window.height / 2,
-            message_text=f"Screenshot was succesfully saved as {timestamp}.png in the current directory!",
-            title="Screenshot successful.",
-            buttons=("OK",)
+    def export_truth_table(self):
+        input_count = sum(1 for gate in self.circuit.gates if gate.gate_type == "INPUT")
+        if input_count > TRUTH_TABLE_MAX_INPUTS:
+            self.show_message("Truth table failed.", f"This circuit has {input_count} INPUTs, an exported truth table can have at most {TRUTH_TABLE_MAX_INPUTS} ({1 << TRUTH_TABLE_MAX_INPUTS} rows).")
+            return
+
+        circuit = self.circuit.snapshot() # compiled and simulated on the writer thread while this one keeps changing
+
+        def write_truth_table(path):
+            with open(path, "w") as file:
+                TruthTable(circuit.get_netlist()).write_csv(file)
+
+        now = datetime.now()
+        timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
+
+        self.write_in_background(write_truth_table, f"{timestamp}-truth-table.csv", lambda: self.show_message(
+            "Truth table successful.",
+            f"Truth table with {1 << input_count} rows was succesfully saved as {timestamp}-truth-table.csv in the current directory!"
         ))
 
     def hide_show_panel(self):
@@ -249,39 +401,18 @@ class Game(arcade.gui.UIView):
         else:
             hide_button.text = "Show"
 
-    def evaluate(self):
-        process_nodes = []
-        outputs = []
-
-        for gate in self.gates:
-            if gate.gate_type == "LABEL":
-                continue
+    def update_views(self, gate_ids):
+        self.frame_stats.add("changed_gates", len(gate_ids))
 
-            if not gate.output:
-                gate.calculate_value()
+        for gate_id in gate_ids:
+            self.gates[gate_id].update_texture()
 
-            if gate.gate_type == "OUTPUT" and gate.input:
-                outputs.append(gate.value)
+        for loop in self.circuit.oscillating:
+            logging.warning(f"Feedback loop through gates {loop} oscillates, its gates are shown as None")
 
-            if not gate.gate_type in ["INPUT", "OUTPUT"] and gate.input and gate.output:
-                process_nodes.append(gate.gate_type)
-
-        for requirement in LEVELS[self.level_num]:
-            if requirement[1] == "INPUT":
-                continue
-
-            if requirement[1] == "OUTPUT":
-                for _ in range(requirement[0]):
-                    if not requirement[2] in outputs:
-                        return
-                    else:
-                        outputs.remove(requirement[2])
-            else:
-                for _ in range(requirement[0]):
-                    if not requirement[1] in process_nodes:
-                        return
-                    else:
-                        process_nodes.remove(requirement[1])
+    def check_level(self):
+        if not self.circuit.is_level_completed(LEVELS[self.level_num]):
+            return
 
         if not self.level_num in self.data["completed_levels"]:
             self.data["completed_levels"].append(self.level_num)
@@ -292,24 +423,61 @@ class Game(arcade.gui.UIView):
             file.write(json.dumps(self.data, indent=4))
                     
     def add_connection(self):
-        output_gate = self.gates[self.selected_output]
-        input_gate = self.gates[self.selected_input]
+        self.connect_gates(self.selected_output, self.selected_input)
+        self.history.push(("connect", self.selected_output, self.selected_input))
 
-        output_gate.output = input_gate
-        input_gate.input.append(output_gate)
-
-        self.connections.append([self.selected_output, self.selected_input])
-        
         self.selected_output = None 
         self.selected_input = None
 
-        self.evaluate()
+    def connect_gates(self, output_id, input_id, input_index=None):
+        self.journal.record("add_connection", output_id, input_id, input_index)
+        self.invalidate_wire((output_id, input_id))
+        self.frame_stats.add("propagations")
+        self.update_views(self.circuit.add_connection(output_id, input_id, input_index))
+
+        self.check_level()
+
+    def disconnect_gates(self, output_id, input_id):
+        # returns the history entry that puts the connection back where it was
+        input_index = self.circuit.gates[input_id].input.index(output_id)
+
+        self.journal.record("disconnect", output_id, input_id)
+        self.remove_wire((output_id, input_id))
+        self.frame_stats.add("propagations")
+        self.update_views(self.circuit.remove_connection(output_id, input_id))
+
+        self.check_level()
+
+        return ("disconnect", output_id, input_id, input_index)
+
+    def set_input(self, gate_id, value):
+        self.frame_stats.add("propagations")
+        self.update_views(self.circuit.set_input(gate_id, value))
+        self.journal.record("set_input", gate_id, value)
+
+        self.check_level()
+
+    def move_gate(self, gate_id, x, y):
+        gate = self.gates[gate_id]
+
+        if not isinstance(gate, arcade.gui.UIInputText):
+            gate.center_x += x - gate.gate.x
+            gate.center_y += y - gate.gate.y
+        else:
+            gate.rect = gate.rect.move(x - gate.gate.x, y - gate.gate.y)
+
+        gate.gate.x = x
+        gate.gate.y = y
+
+        self.update_gate_index(gate_id)
+        self.journal.record("move", gate_id, gate.gate.x, gate.gate.y)
+        self.invalidate_wires(gate_id)
 
     def select_output(self, gate_id):
         if gate_id == self.selected_input:
             return
 
-        if self.gates[gate_id].output:
+        if self.circuit.gates[gate_id].output is not None:
             return
         
         self.selected_output = gate_id
@@ -322,10 +490,10 @@ class Game(arcade.gui.UIView):
             return
         
         if self.level_num != -1:
-            if self.gates[gate_id].gate_type not in SINGLE_INPUT_LOGICAL_GATES and len(self.gates[gate_id].input) == 2:
+            if self.circuit.gates[gate_id].gate_type not in SINGLE_INPUT_LOGICAL_GATES and len(self.circuit.gates[gate_id].input) == 2:
                 return
             
-        if self.gates[gate_id].gate_type in SINGLE_INPUT_LOGICAL_GATES and len(self.gates[gate_id].input) == 1:
+        if self.circuit.gates[gate_id].gate_type in SINGLE_INPUT_LOGICAL_GATES and len(self.circuit.gates[gate_id].input) == 1:
             return
 
         self.selected_input = gate_id
@@ -334,26 +502,201 @@ class Game(arcade.gui.UIView):
             self.add_connection()
 
     def add_gate(self, x, y, gate_type):
-        if gate_type != "LABEL":
-            sprite = LogicalGate(len(self.gates), x, y, gate_type)
+        text = "Placeholder" if gate_type == "LABEL" else None
+        self.create_gate(x, y, gate_type, text)
+        self.history.push(("add_gate", x, y, gate_type, text))
+
+    def create_gate(self, x, y, gate_type, text):
+        self.journal.record("add_gate", x, y, gate_type, text)
+        self.add_gate_view(self.circuit.add_gate(x, y, gate_type, text=text))
+
+    def remove_last_gate(self):
+        gate = self.gates.pop()
+        self.gate_index.remove(gate.id)
+        self.view_dirty = True
+
+        if gate.gate_type == "LABEL":
+            self.labels.remove(gate)
+            self.ui.remove(gate)
+        elif gate.id in self.visible_gates:
+            self.visible_gates.remove(gate.id)
+            self.spritelist.remove(gate)
+
+        if self.dragged_gate is gate:
+            self.dragged_gate = None
+        if gate.id in (self.selected_input, self.selected_output):
+            self.selected_input = self.selected_output = None
+
+        self.circuit.remove_last_gate()
+        self.journal.record("remove_gate")
+
+    def undo(self):
+        entry = self.history.undo()
+        if entry is None:
+            return
+
+        kind = entry[0]
+
+        if kind == "add_gate":
+            self.remove_last_gate()
+        elif kind == "connect":
+            self.disconnect_gates(entry[1], entry[2])
+        elif kind == "disconnect":
+            self.connect_gates(*entry[1:])
+        elif kind == "move":
+            self.move_gate(entry[1], entry[2], entry[3])
+        elif kind == "set_input":
+            self.set_input(entry[1], entry[2])
+
+    def redo(self):
+        entry = self.history.redo()
+        if entry is None:
+            return
+
+        kind = entry[0]
+
+        if kind == "add_gate":
+            self.create_gate(*entry[1:])
+        elif kind == "connect":
+            self.connect_gates(entry[1], entry[2])
+        elif kind == "disconnect":
+            self.disconnect_gates(entry[1], entry[2])
+        elif kind == "move":
+            self.move_gate(entry[1], entry[4], entry[5])
+        elif kind == "set_input":
+            self.set_input(entry[1], entry[3])
+
+    def add_gate_view(self, gate):
+        if gate.gate_type != "LABEL":
+            sprite = LogicalGate(gate)
             self.gates.append(sprite)
-            self.spritelist.append(sprite)
         else:
-            label = self.add_widget(arcade.gui.UIInputText(text="Placeholder", x=x, y=y, font_name="Roboto", font_size=14, width=self.window.width / 10, height=self.window.height / 30))
+            label = self.add_widget(arcade.gui.UIInputText(text=gate.text, x=gate.x, y=gate.y, font_name="Roboto", font_size=14, width=self.window.width / 10, height=self.window.height / 30))
             self.gates.append(label)
-            label.id = len(self.gates)
+            self.labels.append(label)
+            label.gate = gate
+            label.id = gate.id
             label.gate_type = "LABEL"
 
-        self.evaluate()
+        self.update_gate_index(gate.id)
+
+    def update_gate_index(self, gate_id):
+        rect = self.gates[gate_id].rect
+        self.gate_index.insert(gate_id, (rect.left, rect.bottom, rect.right, rect.top))
+        self.view_dirty = True
+
+    def gates_at(self, x, y):
+        # the gates under a world position in the same order as self.gates
+        return [self.gates[gate_id] for gate_id in sorted(self.gate_index.query_point(x, y)) if self.gates[gate_id].rect.point_in_rect((x, y))]
 
     def connection_between(self, p0, p3):
-        dx = p3[0] - p0[0]
-        offset = max(60, abs(dx) * 0.45)
-        c1 = (p0[0] + offset, p0[1])
-        c2 = (p3[0] - offset, p3[1])
+        return connection_points(p0, p3, segments=100)
+
+    def invalidate_wire(self, wire):
+        # only the bounds are updated here, the curve itself is generated once the wire is on screen or clicked.
+        # the old curve is taken out of its wire layer, so it isn't drawn where the wire used to be meanwhile
+        self.wire_buffers.pop(wire, None)
+        self.dirty_wires.add(wire)
+
+        if wire in self.wire_segments:
+            self.wire_layers[self.wire_segments.pop(wire)[0]].remove(wire)
+
+        p0, c1, c2, p3 = connection_curve(get_gate_port_position(self.gates[wire[0]], "output"), get_gate_port_position(self.gates[wire[1]], "input"))
+        xs, ys = (p0[0], c1[0], c2[0], p3[0]), (p0[1], c1[1], c2[1], p3[1]) # a bezier curve never leaves the bounds of its control points
+        self.wire_index.insert(wire, (min(xs) - WIRE_PICK_DISTANCE, min(ys) - WIRE_PICK_DISTANCE, max(xs) + WIRE_PICK_DISTANCE, max(ys) + WIRE_PICK_DISTANCE))
+        self.view_dirty = True
+
+    def get_wire_layer(self, segments):
+        if segments not in self.wire_layers:
+            self.wire_layers[segments] = WireLayer(self.window.ctx, segments=segments)
+        return self.wire_layers[segments]
+
+    def update_wires(self, wires):
+        # every dirty wire out of these is evaluated in one batch per segment count
+        dirty = [wire for wire in wires if wire in self.dirty_wires]
+        if not dirty:
+            return
 
-        return cubic_bezier_points(p0, c1, c2, p3, segments=100)
+        groups = {}
+        for wire in dirty:
+            curve = connection_curve(get_gate_port_position(self.gates[wire[0]], "output"), get_gate_port_position(self.gates[wire[1]], "input"))
+            segments = 1 if self.wire_scale < STRAIGHT_WIRE_ZOOM else bezier_segment_count(*curve, scale=self.wire_scale)
+            groups.setdefault(segments, ([], []))
+            groups[segments][0].append(wire)
+            groups[segments][1].append(curve)
+
+        for segments, (group_wires, curves) in groups.items():
+            wire_layer = self.get_wire_layer(segments)
+
+            for wire, buffer in zip(group_wires, cubic_bezier_buffers(curves, segments=segments)):
+                old_segments = self.wire_segments.get(wire, (segments, None))[0]
+                if old_segments != segments:
+                    self.wire_layers[old_segments].remove(wire)
+
+                self.wire_buffers[wire] = buffer
+                self.wire_segments[wire] = (segments, self.wire_scale)
+                wire_layer.set(wire, buffer) # rewrites only this wire's range
+                self.dirty_wires.discard(wire)
+
+    def wires_at(self, x, y):
+        wires = self.wire_index.query_point(x, y)
+        self.update_wires(wires)
+        return [wire for wire in wires if polyline_distance(self.wire_buffers[wire], x, y) < WIRE_PICK_DISTANCE]
+
+    def remove_wire(self, wire):
+        self.wire_buffers.pop(wire, None)
+        self.dirty_wires.discard(wire)
+        self.wire_index.remove(wire)
+        self.view_dirty = True
+
+        if wire in self.wire_segments:
+            self.wire_layers[self.wire_segments.pop(wire)[0]].remove(wire)
+
+    def invalidate_wires(self, gate_id):
+        gate = self.circuit.gates[gate_id]
+
+        for input_id in gate.input:
+            self.invalidate_wire((input_id, gate_id))
+
+        if gate.output is not None:
+            self.invalidate_wire((gate_id, gate.output))
             
+    def update_visible(self):
+        # culls gates and generates the curves of dirty wires against the camera's view,
+        # only once the view changed or a gate or wire moved since the last frame
+        x0, y0, _ = self.camera.unproject((0, 0))
+        x1, y1, _ = self.camera.unproject((self.window.width, self.window.height))
+        bounds = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)) # a negative zoom flips the view
+
+        if bounds == self.view_bounds and not self.view_dirty:
+            return
+
+        self.view_bounds = bounds
+        self.view_dirty = False
+
+        visible_gates = sorted(gate_id for gate_id in self.gate_index.query_rect(bounds) if self.gates[gate_id].gate_type != "LABEL")
+        if visible_gates != self.visible_gates:
+            self.visible_gates = visible_gates
+            self.spritelist.clear()
+            self.spritelist.extend(self.gates[gate_id] for gate_id in visible_gates)
+
+        # labels are UI widgets, so they're drawn by the UI camera and culled against the window instead
+        for label in self.labels:
+            visible = label.rect.right >= 0 and label.rect.left <= self.window.width and label.rect.top >= 0 and label.rect.bottom <= self.window.height
+            if label.visible != visible:
+                label.visible = visible
+
+        # the segment count of a wire follows the zoom, rounded up to a power of 2 so that zooming only
+        # regenerates visible wires once it crosses one
+        self.wire_scale = 2 ** math.ceil(math.log2(max(abs(self.camera.zoom), 0.01)))
+
+        visible_wires = self.wire_index.query_rect(bounds)
+        for wire in visible_wires:
+            if wire not in self.dirty_wires and self.wire_segments[wire][1] != self.wire_scale:
+                self.dirty_wires.add(wire)
+
+        self.update_wires(visible_wires)
+
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
         self.camera.zoom += scroll_y * 0.1
 
@@ -365,6 +708,8 @@ class Game(arcade.gui.UIView):
                 else:
                     gate.scale(1 / 1.1)
 
+                self.update_gate_index(gate.id)
+
                 if gate.width < self.window.width / 18:
                     gate.doc.set_style(
                         0,
@@ -416,82 +761,83 @@ class Game(arcade.gui.UIView):
             unprojected_vec = self.camera.unproject((event.x, event.y))
             world_vec = arcade.math.Vec2(unprojected_vec.x, unprojected_vec.y)
 
-            for gate in self.gates:
-                if gate.rect.point_in_rect(world_vec):
-                    self.dragged_gate = gate
+            for gate in self.gates_at(world_vec.x, world_vec.y):
+                self.dragged_gate = gate
 
     def on_mouse_press(self, x, y, button, modifiers):
         unprojected_vec = self.camera.unproject((x, y))
         world_vec = arcade.math.Vec2(unprojected_vec.x, unprojected_vec.y)
 
         if button == arcade.MOUSE_BUTTON_RIGHT:
-            for i in range(len(self.bezier_points) - 1, -1, -1):
-                for point in self.bezier_points[i]:
-                    if world_vec.distance(point) < 5:
-                        self.gates[self.connections[i][0]].output = None
-                        self.gates[self.connections[i][1]].input.remove(self.gates[self.connections[i][0]])
-                        self.gates[self.connections[i][1]].calculate_value()
-
-                        self.connections.pop(i)
-                        self.bezier_points.pop(i)
-                        break
+            # every wire under the click is removed
+            for wire in self.wires_at(world_vec.x, world_vec.y):
+                self.history.push(self.disconnect_gates(*wire))
 
         elif button == arcade.MOUSE_BUTTON_LEFT:
-            for gate in self.gates:
-                if gate.rect.point_in_rect((world_vec.x, world_vec.y)):
-                    width_x = gate.center_x - world_vec.x
-                    if abs(width_x) < (58 if gate.gate_type not in ["INPUT", "OUTPUT"] else 43): # INPUT and OUTPUT buttons are smaller, so they have to be adjusted to 43
-                        self.dragged_gate = gate
-                        if gate.gate_type == "INPUT":
-                            gate.value = not gate.value
-                            self.evaluate()
-                        break
-                    else:
-                        if width_x > 0:
-                            if not gate.gate_type == "INPUT":
-                                self.select_input(gate.id)
-                        elif not gate.gate_type == "OUTPUT":
-                            self.select_output(gate.id)
+            for gate in self.gates_at(world_vec.x, world_vec.y):
+                width_x = gate.center_x - world_vec.x
+                if abs(width_x) < (58 if gate.gate_type not in ["INPUT", "OUTPUT"] else 43): # INPUT and OUTPUT buttons are smaller, so they have to be adjusted to 43
+                    self.dragged_gate = gate
+                    if gate.gate_type == "INPUT":
+                        self.history.push(("set_input", gate.id, gate.value, not gate.value))
+                        self.set_input(gate.id, not gate.value)
+                    break
+                else:
+                    if width_x > 0:
+                        if not gate.gate_type == "INPUT":
+                            self.select_input(gate.id)
+                    elif not gate.gate_type == "OUTPUT":
+                        self.select_output(gate.id)
 
     def on_mouse_drag(self, x, y, dx, dy, button, _modifiers):
         if button == arcade.MOUSE_BUTTON_MIDDLE:
             self.camera.position = self.camera.position - arcade.math.Vec2(dx / self.camera.zoom, dy / self.camera.zoom)
 
         elif self.dragged_gate is not None:
-            if not isinstance(self.dragged_gate, arcade.gui.UIInputText):
-                self.dragged_gate.center_x += dx / self.camera.zoom
-                self.dragged_gate.center_y += dy / self.camera.zoom
-            else:
-                self.dragged_gate.rect = self.dragged_gate.rect.move(dx / self.camera.zoom, dy / self.camera.zoom)
-            
+            gate = self.dragged_gate.gate
+            old_x, old_y = gate.x, gate.y
+
+            self.move_gate(gate.id, gate.x + dx / self.camera.zoom, gate.y + dy / self.camera.zoom)
+            self.history.push_move(gate.id, old_x, old_y, gate.x, gate.y) # one undo step per drag
+
     def on_mouse_release(self, x, y, button, modifiers):
         self.dragged_gate = None
+        self.history.end_gesture()
 
     def main_exit(self):
+        self.journal.close()
+        self.writer.shutdown(wait=False) # writes already queued still finish
         from menus.main import Main
         self.window.show_view(Main(self.pypresence_client))
 
     def on_key_press(self, symbol, modifiers):
         if symbol == arcade.key.ESCAPE:
             self.main_exit()
+        elif symbol == arcade.key.F3:
+            self.toggle_frame_stats()
+        elif symbol == arcade.key.F4:
+            self.export_frame_stats()
+        elif modifiers & (arcade.key.MOD_CTRL | arcade.key.MOD_COMMAND):
+            if symbol == arcade.key.Z and not modifiers & arcade.key.MOD_SHIFT:
+                self.undo()
+            elif symbol == arcade.key.Y or symbol == arcade.key.Z:
+                self.redo()
+
+    def on_draw(self, end_frame=True):
+        self.frame_stats.begin()
 
-    def on_draw(self):
         self.window.clear()
 
         with self.camera.activate():
-            self.spritelist.draw()
-
-            self.bezier_points = []
-
-            for conn in self.connections:
-                start_id, end_id = conn
-                start_gate = self.gates[start_id]
-                end_gate = self.gates[end_id]
+            self.update_visible()
+            self.frame_stats.mark("culling")
 
-                points = self.connection_between(get_gate_port_position(start_gate, "output"), get_gate_port_position(end_gate, "input"))
-                self.bezier_points.append(points)
+            self.spritelist.draw()
+            self.frame_stats.mark("sprites")
 
-                arcade.draw_line_strip(points, arcade.color.WHITE, 6)
+            for wire_layer in self.wire_layers.values():
+                wire_layer.draw()
+            self.frame_stats.mark("wires")
 
             mouse_x, mouse_y = self.window.mouse.data.get("x", 0), self.window.mouse.data.get("y", 0)
 
@@ -502,5 +848,13 @@ class Game(arcade.gui.UIView):
             if self.selected_output is not None and self.selected_input is None:
                 points = self.connection_between(get_gate_port_position(self.gates[self.selected_output], "output"), (mouse_x, mouse_y))
                 arcade.draw_line_strip(points, arcade.color.WHITE, 6)
+
+            self.frame_stats.mark("preview")
         
         self.ui.draw()
+        self.frame_stats.mark("ui")
+
+        if end_frame:
+            self.frame_stats.add("evaluations", self.circuit.evaluations)
+            self.circuit.evaluations = 0
+            self.frame_stats.end_frame(self.frame_interval)
@@ -0,0 +1,95 @@
+import arcade
+
+from array import array
+from arcade.gl import BufferDescription
+
+class WireLayer:
+    # every wire lives in one GPU buffer as a fixed size range of line segments, drawn with a single instanced call
+    def __init__(self, ctx, segments=100, color=arcade.color.WHITE, line_width=6):
+        self.ctx = ctx
+        self.segments = segments
+        self.color = arcade.types.Color.from_iterable(color).normalized
+        self.line_width = line_width
+
+        self.stride = segments * 4 * 4 # (x0, y0, x1, y1) float32 per segment
+        self.slots = {} # wire -> index of its range in the buffer
+        self.wires = [] # index -> wire
+        self.data = [] # index -> segment data, kept to move the last range into a removed one
+
+        self.capacity = 0
+        self.buffer = None
+        self.geometry = None
+        self.reserve(64)
+
+    def reserve(self, capacity):
+        buffer = self.ctx.buffer(reserve=capacity * self.stride)
+        if self.buffer is not None and self.wires:
+            buffer.copy_from_buffer(self.buffer, len(self.wires) * self.stride)
+
+        self.capacity = capacity
+        self.buffer = buffer
+        self.geometry = self.ctx.geometry(
+            [
+                BufferDescription(self.ctx.buffer(data=array("f", [0.0] * 8)), "2f", ["in_vert"]), # the 4 quad corners are picked by gl_VertexID
+                BufferDescription(self.buffer, "4f", ["in_instance_pos"], instanced=True),
+            ],
+            mode=self.ctx.TRIANGLE_STRIP,
+        )
+
+    @staticmethod
+    def line_segments(points):
+        # x, y interleaved points of a line strip -> (x0, y0, x1, y1) for every segment
+        data = array("f", bytes(8 * (len(points) - 2)))
+        data[0::4] = points[0:-2:2]
+        data[1::4] = points[1:-2:2]
+        data[2::4] = points[2::2]
+        data[3::4] = points[3::2]
+        return data
+
+    def set(self, wire, points):
+        data = self.line_segments(points)
+        index = self.slots.get(wire)
+
+        if index is None:
+            if len(self.wires) == self.capacity:
+                self.reserve(self.capacity * 2)
+
+            index = len(self.wires)
+            self.slots[wire] = index
+            self.wires.append(wire)
+            self.data.append(data)
+        else:
+            self.data[index] = data
+
+        self.buffer.write(data, offset=index * self.stride)
+
+    def remove(self, wire):
+        index = self.slots.pop(wire, None)
+        if index is None:
+            return
+
+        last_wire = self.wires.pop()
+        last_data = self.data.pop()
+
+        if index < len(self.wires):
+            self.wires[index] = last_wire
+            self.data[index] = last_data
+            self.slots[last_wire] = index
+            self.buffer.write(last_data, offset=index * self.stride)
+
+    def clear(self):
+        self.slots.clear()
+        self.wires.clear()
+        self.data.clear()
+
+    def draw(self):
+        if not self.wires:
+            return
+
+        program = self.ctx.shape_line_program
+        program["line_width"] = self.line_width
+        program["color"] = self.color
+
+        self.ctx.enable(self.ctx.BLEND)
+        self.geometry.render(program, instances=len(self.wires) * self.segments)
+        self.ctx.disable(self.ctx.BLEND)
@@ -1,8 +1,9 @@
-import arcade, arcade.gui, asyncio, pypresence, time, copy, json
+import arcade, arcade.gui, time, json, logging
 
-from utils.constants import big_button_style, discord_presence_id
+from utils.constants import big_button_style, discord_presence_id, recovery_dir
 from utils.preload import button_texture, button_hovered_texture
 from utils.utils import FakePyPresence
+from utils.presence import PresenceClient
 
 class Main(arcade.gui.UIView):
     def __init__(self, pypresence_client=None):
@@ -12,42 +13,34 @@ class Main(arcade.gui.UIView):
         self.box = self.anchor.add(arcade.gui.UIBoxLayout(space_between=10), anchor_x='center', anchor_y='center')
 
         self.pypresence_client = pypresence_client
+        self.startup = pypresence_client is None
+        self.start_presence_after_draw = False
 
         with open("settings.json", "r") as file:
             self.settings_dict = json.load(file)
 
         if self.settings_dict.get('discord_rpc', True):
             if self.pypresence_client == None: # Game has started
-                try:
-                    asyncio.get_event_loop()
-                except:
-                    asyncio.set_event_loop(asyncio.new_event_loop())
-                try:
-                    self.pypresence_client = pypresence.Presence(discord_presence_id)
-                    self.pypresence_client.connect()
-                    self.pypresence_client.start_time = time.time()
-                except:
-                    self.pypresence_client = FakePyPresence()
-                    self.pypresence_client.start_time = time.time()
+                # the client's thread imports pypresence, that is left until the first frame is shown
+                self.pypresence_client = PresenceClient(discord_presence_id, time.time())
+                self.start_presence_after_draw = True
 
             elif isinstance(self.pypresence_client, FakePyPresence): # the user has enabled RPC in the settings in this session.
-                # get start time from old object
-                start_time = copy.deepcopy(self.pypresence_client.start_time)
-                try:
-                    self.pypresence_client = pypresence.Presence(discord_presence_id)
-                    self.pypresence_client.connect()
-                    self.pypresence_client.start_time = start_time
-                except:
-                    self.pypresence_client = FakePyPresence()
-                    self.pypresence_client.start_time = start_time
-
-            self.pypresence_client.update(state='In Menu', details='In Main Menu', start=self.pypresence_client.start_time)
+                self.pypresence_client = PresenceClient(discord_presence_id, self.pypresence_client.start_time)
+                self.pypresence_client.start()
         else: # game has started, but the user has disabled RPC in the settings.
             self.pypresence_client = FakePyPresence()
             self.pypresence_client.start_time = time.time()
 
         self.pypresence_client.update(state='In Menu', details='In Main Menu', start=self.pypresence_client.start_time)
 
+    def on_draw(self):
+        super().on_draw()
+
+        if self.start_presence_after_draw:
+            self.start_presence_after_draw = False
+            self.pypresence_client.start()
+
     def on_show_view(self):
         super().on_show_view()
 
@@ -62,6 +55,30 @@ class Main(arcade.gui.UIView):
         self.settings_button = self.box.add(arcade.gui.UITextureButton(text="Settings", texture=button_texture, texture_hovered=button_hovered_texture, width=self.window.width / 2, height=self.window.height / 8, style=big_button_style))
         self.settings_button.on_click = lambda event: self.settings()
 
+        if self.startup:
+            self.startup = False
+            self.recover()
+
+    def recover(self):
+        # reopens the last game if the previous run didn't exit cleanly
+        from simulation.journal import Journal
+
+        try:
+            recovered = Journal.recover(recovery_dir)
+        except (OSError, ValueError, TypeError, IndexError, KeyError) as e:
+            logging.warning(f"Couldn't recover the last session from {recovery_dir}: {e!r}")
+            return
+
+        if recovered is None:
+            return
+
+        circuit, level_num = recovered
+        logging.info(f"Recovered an unsaved session with {len(circuit.gates)} gates")
+
+        from game.play import Game
+        self.pypresence_client.start() # the game is shown before this menu draws its first frame
+        arcade.schedule_once(lambda delta_time: self.window.show_view(Game(self.pypresence_client, level_num, circuit)), 0)
+
     def tutorial(self):
         from menus.tutorial import Tutorial
         self.window.show_view(Tutorial(self.pypresence_client))
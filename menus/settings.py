@@ -1,9 +1,10 @@
-import copy, pypresence, json, os
+import copy, json, os
 
 import arcade, arcade.gui
 
 from utils.constants import button_style, dropdown_style, slider_style, settings, discord_presence_id, settings_start_category
 from utils.utils import FakePyPresence
+from utils.presence import PresenceClient
 from utils.preload import button_texture, button_hovered_texture
 
 from arcade.gui import UIBoxLayout, UIAnchorLayout
@@ -169,19 +170,13 @@ class Settings(arcade.gui.UIView):
                     start_time = copy.deepcopy(self.pypresence_client.start_time)
                     self.pypresence_client.close()
                     del self.pypresence_client
-                    try:
-                        self.pypresence_client = pypresence.Presence(discord_presence_id)
-                        self.pypresence_client.connect()
-                        self.pypresence_client.update(state='In Settings', details='Modifying Settings', start=start_time)
-                        self.pypresence_client.start_time = start_time
-                    except:
-                        self.pypresence_client = FakePyPresence()
-                        self.pypresence_client.start_time = start_time
+                    self.pypresence_client = PresenceClient(discord_presence_id, start_time)
+                    self.pypresence_client.start()
+                    self.pypresence_client.update(state='In Settings', details='Modifying Settings', start=start_time)
             else:
                 if not isinstance(self.pypresence_client, FakePyPresence):
                     start_time = copy.deepcopy(self.pypresence_client.start_time)
-                    self.pypresence_client.update()
-                    self.pypresence_client.close()
+                    self.pypresence_client.close() # clears the activity
                     del self.pypresence_client
                     self.pypresence_client = FakePyPresence()
                     self.pypresence_client.start_time = start_time
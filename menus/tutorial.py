@@ -21,6 +21,9 @@ class Tutorial(arcade.gui.UIView):
 - On DIY mode, a node can have more than 2 inputs, except for OUTPUT and NOT
 - You can change an INPUT's gate value by clicking on it
 - You have to connect the nodes in a way to meet the required result
+- On DIY mode, the Truth Table button saves the OUTPUT values for every INPUT combination as a CSV file
+- Ctrl+Z undoes your last change, Ctrl+Y (or Ctrl+Shift+Z) redoes it
+- F3 shows frame timings, F4 saves the last 600 frames of them as a CSV file in the logs directory
                                                      
 Logical Gates explanation:
 - AND: Returns 1 if all inputs are 1, otherwise 0
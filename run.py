@@ -1,3 +1,7 @@
+import time
+
+startup_start = time.perf_counter()
+
 import pyglet
 
 pyglet.options['shadow_window'] = False  # Fix double window issue on Wayland
@@ -10,11 +14,13 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 pyglet.resource.path.append(script_dir)
 pyglet.font.add_directory(os.path.join(script_dir, 'assets', 'fonts'))
 
-from utils.utils import get_closest_resolution, print_debug_info, on_exception
+from utils.utils import get_closest_resolution, print_debug_info, on_exception, StartupTimer
 from utils.constants import log_dir, save_dir, menu_background_color
-from menus.main import Main
 from arcade.experimental.controller_window import ControllerWindow
 
+startup_timer = StartupTimer(startup_start)
+startup_timer.mark("imports")
+
 sys.excepthook = on_exception
 
 __builtins__.print = lambda *args, **kwargs: logging.debug(" ".join(map(str, args)))
@@ -24,8 +30,8 @@ if not log_dir in os.listdir():
 
 if not save_dir in os.listdir():
     os.makedirs(save_dir)
-while len(os.listdir(log_dir)) >= 5:
-    files = [(file, os.path.getctime(os.path.join(log_dir, file))) for file in os.listdir(log_dir)]
+while len(log_files := [file for file in os.listdir(log_dir) if not file.startswith("frame-stats-")]) >= 5: # exported frame stats are kept
+    files = [(file, os.path.getctime(os.path.join(log_dir, file))) for file in log_files]
     oldest_file = sorted(files, key=lambda x: x[1])[0][0]
     os.remove(os.path.join(log_dir, oldest_file))
 
@@ -89,6 +95,8 @@ else:
     with open("settings.json", "w") as file:
         file.write(json.dumps(settings))
 
+startup_timer.mark("settings")
+
 try:
     window = ControllerWindow(width=resolution[0], height=resolution[1], title='LogicalSignals', samples=antialiasing, antialiasing=antialiasing > 0, fullscreen=fullscreen, vsync=vsync, resizable=False, style=style, visible=False)
 except (FileNotFoundError, PermissionError) as e:
@@ -113,9 +121,22 @@ else:
 
 arcade.set_background_color(menu_background_color)
 
+startup_timer.mark("window")
+
 print_debug_info()
+
+startup_timer.mark("debug info")
+
+import utils.preload # only the button textures, gate textures are loaded when a game first needs them
+
+startup_timer.mark("textures")
+
+# menus and the game are imported as they're needed, pypresence once the first frame is shown
+from menus.main import Main
 main = Main()
 
+startup_timer.mark("main menu")
+
 window.show_view(main)
 
 # Make window visible after all setup is complete (helps prevent double window on Wayland)
@@ -123,6 +144,11 @@ window.set_visible(True)
 
 logging.debug('Game started.')
 
+startup_timer.report_after_first_frame(window)
+
 arcade.run()
 
+if hasattr(window.current_view, "journal"): # closing the window in a game is a clean exit too
+    window.current_view.journal.close()
+
 logging.info('Exited with error code 0.')
@@ -0,0 +1,60 @@
+import argparse, json, os, sys
+
+from multiprocessing import Pool
+
+from simulation.circuit import Circuit
+from simulation.levels import LEVELS
+
+def grade_save(path, level_num):
+    try:
+        circuit = Circuit.load(path, evaluate=True) # grading doesn't trust the stored values
+    except (OSError, ValueError, TypeError, IndexError, KeyError) as e:
+        return {"file": path, "level": level_num + 1, "error": f"{type(e).__name__}: {e}"}
+
+    netlist = circuit.get_netlist()
+
+    return {
+        "file": path,
+        "level": level_num + 1,
+        "completed": circuit.is_level_completed(LEVELS[level_num]),
+        "gates": sum(1 for gate in circuit.gates if gate.gate_type != "LABEL"),
+        "connections": len(circuit.connections),
+        "outputs": [netlist.values[gate_id] for gate_id in netlist.output_ids],
+        "oscillating": netlist.oscillating,
+    }
+
+def grade_save_args(args):
+    return grade_save(*args)
+
+def find_saves(directory):
+    return sorted(entry.path for entry in os.scandir(directory) if entry.is_file() and entry.name.endswith((".json", ".bin")))
+
+def grade_saves(paths, level_num, workers=None, chunksize=16):
+    # yields one result per save as soon as a worker finishes it, not in input order
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(grade_save_args, [(path, level_num) for path in paths], chunksize=chunksize)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulation.batch", description="Evaluates every save in a directory against a level and prints the results as JSON lines.")
+    parser.add_argument("directory", help="directory of saves, like saves/")
+    parser.add_argument("--level", type=int, required=True, help=f"level number as shown in the game, 1 to {len(LEVELS)}")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the number of cores")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.level <= len(LEVELS):
+        parser.error(f"--level has to be between 1 and {len(LEVELS)}")
+
+    completed = 0
+    total = 0
+
+    for result in grade_saves(find_saves(args.directory), args.level - 1, args.workers):
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+        total += 1
+        completed += bool(result.get("completed"))
+
+    print(f"{completed}/{total} saves complete level {args.level}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
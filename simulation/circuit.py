@@ -0,0 +1,210 @@
+import json
+
+from simulation.netlist import Netlist
+from simulation.levels import is_level_completed
+from simulation.save_format import is_binary_save, read_circuit, write_circuit
+
+class Gate:
+    def __init__(self, id, x, y, gate_type, value=None, text=None):
+        self.id = id
+        self.x = x
+        self.y = y
+        self.gate_type = gate_type
+        self.value = value
+        self.text = text # only used by LABEL
+
+        self.input: list[int] = []
+        self.output: int | None = None
+
+    def __repr__(self):
+        return f"{self.gate_type}: {self.value}"
+
+class Circuit:
+    def __init__(self):
+        self.gates: list[Gate] = []
+        self.connections: dict[tuple[int, int], None] = {} # (output id, input id) in the order they were made
+
+        self.netlist = None
+        self.netlist_dirty = True
+        self.evaluations = 0 # netlist compiles and whole circuit evaluations, for whoever wants to count them
+
+    def add_gate(self, x, y, gate_type, value=None, text=None):
+        gate = Gate(len(self.gates), x, y, gate_type, value, text)
+        self.gates.append(gate)
+
+        if not self.netlist_dirty: # a new gate has no connections, so no value can change yet
+            self.netlist.add_gate(gate_type if gate_type != "LABEL" else None, value)
+        return gate
+
+    def remove_last_gate(self):
+        # only used to undo add_gate, so the gate has no connections left
+        gate = self.gates.pop()
+
+        if not self.netlist_dirty:
+            self.netlist.remove_last_gate()
+        return gate
+
+    def connect(self, output_id, input_id, input_index=None):
+        # only changes the wiring, add_connection also updates the values.
+        # input_index puts back an input where disconnect took it from
+        self.gates[output_id].output = input_id
+        gate_inputs = self.gates[input_id].input
+        gate_inputs.insert(len(gate_inputs) if input_index is None else input_index, output_id)
+
+        self.connections[output_id, input_id] = None
+
+        if not self.netlist_dirty and not self.netlist.connect(output_id, input_id, input_index):
+            self.netlist_dirty = True # closes a feedback loop
+
+    def disconnect(self, output_id, input_id):
+        del self.connections[output_id, input_id]
+
+        self.gates[output_id].output = None
+        self.gates[input_id].input.remove(output_id)
+
+        if not self.netlist_dirty and not self.netlist.disconnect(output_id, input_id):
+            self.netlist_dirty = True # might open a feedback loop
+
+    def add_connection(self, output_id, input_id, input_index=None):
+        self.connect(output_id, input_id, input_index)
+        return self.propagate([input_id])
+
+    def remove_connection(self, output_id, input_id):
+        gate_ids = [input_id]
+
+        if not self.netlist_dirty:
+            loop = self.netlist.loop_of[input_id]
+            if loop >= 0 and loop == self.netlist.loop_of[output_id]:
+                # the loop can fall apart, and its gates could still hold the None of an oscillation
+                gate_ids = list(self.netlist.loops[loop])
+
+        self.disconnect(output_id, input_id)
+        return self.propagate(gate_ids)
+
+    def set_input(self, gate_id, value):
+        self.gates[gate_id].value = value
+
+        if not self.netlist_dirty:
+            self.netlist.set_input(gate_id, value)
+
+        return [gate_id] + self.propagate([gate_id]) # the INPUT itself is already up to date, so propagate won't report it
+
+    def get_netlist(self):
+        if self.netlist_dirty:
+            gate_types = [gate.gate_type if gate.gate_type != "LABEL" else None for gate in self.gates]
+            inputs = [gate.input for gate in self.gates]
+            values = [gate.value for gate in self.gates]
+
+            self.netlist = Netlist(gate_types, inputs, values)
+            self.netlist_dirty = False
+            self.evaluations += 1
+
+        return self.netlist
+
+    def sync_values(self, gate_ids):
+        # copies netlist values into the gates, returns the ids of the gates that changed
+        values = self.netlist.values
+        changed = []
+
+        for gate_id in gate_ids:
+            gate = self.gates[gate_id]
+            if gate.value != values[gate_id]:
+                gate.value = values[gate_id]
+                changed.append(gate_id)
+
+        return changed
+
+    def evaluate(self):
+        netlist = self.get_netlist()
+        netlist.evaluate()
+        self.evaluations += 1
+
+        return self.sync_values(range(netlist.size))
+
+    def propagate(self, gate_ids):
+        netlist = self.get_netlist()
+        return self.sync_values(netlist.propagate(gate_ids))
+
+    @property
+    def oscillating(self):
+        # feedback loops which didn't settle during the last update, as lists of gate ids
+        return self.netlist.oscillating if self.netlist is not None else []
+
+    def is_level_completed(self, level):
+        netlist = self.get_netlist()
+        return is_level_completed(level, [netlist.values[gate_id] for gate_id in netlist.output_ids], netlist.process_types)
+
+    def snapshot(self):
+        # a copy of the gates and connections without a netlist, for saving on another thread while this circuit keeps changing
+        circuit = Circuit()
+
+        for gate in self.gates:
+            gate_copy = Gate(gate.id, gate.x, gate.y, gate.gate_type, gate.value, gate.text)
+            gate_copy.input = list(gate.input)
+            gate_copy.output = gate.output
+            circuit.gates.append(gate_copy)
+
+        circuit.connections = dict(self.connections)
+
+        return circuit
+
+    def to_save_data(self):
+        data = []
+
+        for gate in self.gates:
+            if gate.gate_type != "LABEL":
+                data.append([gate.id, gate.x, gate.y, gate.gate_type, gate.value, list(gate.input), gate.output])
+            else:
+                data.append([gate.id, gate.x, gate.y, gate.gate_type, gate.text])
+
+        return data
+
+    @classmethod
+    def from_save_data(cls, data):
+        # saves refer to gates by the id stored in their first field, which isn't always the gate's position:
+        # the original game gave LABELs the id of the gate after them. gates get new ids in load order and
+        # every reference is translated through id_map, LABELs are never referenced so their ids are ignored
+        circuit = cls()
+        id_map = {}
+
+        for gate in data:
+            if gate[3] != "LABEL":
+                id_map[gate[0]] = circuit.add_gate(gate[1], gate[2], gate[3], gate[4]).id
+            else:
+                circuit.add_gate(gate[1], gate[2], gate[3], text=gate[4])
+
+        for gate, gate_model in zip(data, circuit.gates):
+            if gate[3] == "LABEL":
+                continue
+
+            gate_model.input = [id_map[input_id] for input_id in gate[5]]
+            gate_model.output = id_map[gate[6]] if gate[6] is not None else None
+
+            for input_id in gate_model.input:
+                circuit.connections[input_id, gate_model.id] = None
+
+        return circuit
+
+    def save(self, path, level=None):
+        # .json paths keep the old save format without the level, anything else is written in the binary one
+        if not path.endswith(".json"):
+            write_circuit(self, path, level)
+            return
+
+        with open(path, "w") as file:
+            file.write(json.dumps(self.to_save_data(), indent=4))
+
+    @classmethod
+    def load(cls, path, evaluate=False):
+        # saves keep every gate's value, but older or hand-edited ones can disagree with their wiring. the game
+        # evaluates what it loads, evaluate=False is for only looking at a save, like drawing its thumbnail
+        if is_binary_save(path):
+            circuit = read_circuit(path, cls)
+        else:
+            with open(path, "r") as file:
+                circuit = cls.from_save_data(json.load(file))
+
+        if evaluate:
+            circuit.evaluate()
+
+        return circuit
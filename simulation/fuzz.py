@@ -0,0 +1,99 @@
+import argparse, random, sys, time
+
+from simulation.circuit import Circuit
+from simulation.gates import LOGICAL_GATES, SINGLE_INPUT_LOGICAL_GATES
+
+# Random edit sequences, applied the way the game applies them: incrementally, through add_connection,
+# remove_connection and set_input. After every edit the circuit has to match a copy of itself evaluated from
+# scratch, which covers feedback loops being closed, broken and oscillating.
+#   python -m simulation.fuzz --seeds 3000
+
+GATE_TYPES = list(LOGICAL_GATES) + ["INPUT", "OUTPUT", "LABEL"]
+
+def random_edit(circuit, rng):
+    gates = circuit.gates
+    roll = rng.random()
+
+    if roll < 0.25 or len(gates) < 2:
+        gate_type = rng.choice(GATE_TYPES)
+        circuit.add_gate(0, 0, gate_type, rng.choice((0, 1)) if gate_type == "INPUT" else None)
+        return ("add_gate", gate_type)
+
+    if roll < 0.3:
+        gate = gates[-1]
+        if gate.input or gate.output is not None:
+            return None
+
+        circuit.remove_last_gate()
+        return ("remove_gate",)
+
+    if roll < 0.65:
+        output_id, input_id = rng.randrange(len(gates)), rng.randrange(len(gates))
+        output_gate, input_gate = gates[output_id], gates[input_id]
+
+        if output_gate.gate_type == "LABEL" or output_gate.output is not None or input_gate.gate_type in ("LABEL", "INPUT"):
+            return None
+        if len(input_gate.input) >= (1 if input_gate.gate_type in SINGLE_INPUT_LOGICAL_GATES else 3):
+            return None
+
+        circuit.add_connection(output_id, input_id, rng.randint(0, len(input_gate.input)))
+        return ("add_connection", output_id, input_id)
+
+    if roll < 0.85:
+        if not circuit.connections:
+            return None
+
+        output_id, input_id = rng.choice(list(circuit.connections))
+        circuit.remove_connection(output_id, input_id)
+        return ("remove_connection", output_id, input_id)
+
+    input_ids = [gate.id for gate in gates if gate.gate_type == "INPUT"]
+    if not input_ids:
+        return None
+
+    gate_id, value = rng.choice(input_ids), rng.choice((0, 1, None))
+    circuit.set_input(gate_id, value)
+    return ("set_input", gate_id, value)
+
+def check_seed(seed, edit_count=150):
+    # returns the edits up to the first mismatch, or None
+    rng = random.Random(seed)
+    circuit = Circuit()
+    edits = []
+
+    for _ in range(edit_count):
+        edit = random_edit(circuit, rng)
+        if edit is None:
+            continue
+        edits.append(edit)
+
+        fresh = circuit.snapshot()
+        fresh.evaluate()
+
+        if [gate.value for gate in circuit.gates] != [gate.value for gate in fresh.gates]:
+            return edits
+
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulation.fuzz", description="Checks incremental propagation against evaluating from scratch on random edit sequences.")
+    parser.add_argument("--seeds", type=int, default=1000, help="number of random edit sequences")
+    parser.add_argument("--edits", type=int, default=150, help="edits per sequence")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    failed = []
+
+    for seed in range(args.seeds):
+        edits = check_seed(seed, args.edits)
+        if edits is not None:
+            print(f"Seed {seed}: mismatch after {edits[-1]}, {len(edits)} edits")
+            failed.append(seed)
+
+    print(f"Checked {args.seeds} edit sequences in {time.perf_counter() - start:.2f}s")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+SINGLE_INPUT_LOGICAL_GATES = ["NOT", "OUTPUT"]
+
+LOGICAL_GATES = {
+    "AND": lambda a, b: a and b,
+    "OR": lambda a, b: a or b,
+    "NAND": lambda a, b: not (a and b),
+    "NOR": lambda a, b: not (a or b),
+    "XOR": lambda a, b: a != b,
+    "XNOR": lambda a, b: a == b,
+    "NOT": lambda a: not a,
+}
@@ -0,0 +1,74 @@
+import sys
+
+from collections import deque
+
+# Every entry is a small tuple describing one edit, enough to apply it again or invert it:
+#   ("add_gate", x, y, gate_type, text)
+#   ("connect", output id, input id)
+#   ("disconnect", output id, input id, position in the input's inputs)
+#   ("move", gate id, old x, old y, new x, new y)
+#   ("set_input", gate id, old value, new value)
+# Gates are only ever removed by undoing the add_gate that made them, which is always the last gate,
+# since every later edit has to be undone first.
+
+class History:
+    def __init__(self, memory_budget=1024 * 1024):
+        self.memory_budget = memory_budget # bytes of undo entries, the oldest are dropped past it
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.memory = 0
+        self.gesture_open = False # moves are merged into one entry until end_gesture
+
+    @staticmethod
+    def entry_size(entry):
+        return sys.getsizeof(entry) + sum(sys.getsizeof(item) for item in entry)
+
+    def push(self, entry):
+        self.redo_stack.clear()
+        self.gesture_open = False
+
+        self.undo_stack.append(entry)
+        self.memory += self.entry_size(entry)
+
+        while self.memory > self.memory_budget and len(self.undo_stack) > 1:
+            self.memory -= self.entry_size(self.undo_stack.popleft())
+
+    def push_move(self, gate_id, old_x, old_y, x, y):
+        last = self.undo_stack[-1] if self.undo_stack else None
+
+        if self.gesture_open and last[0] == "move" and last[1] == gate_id:
+            self.undo_stack[-1] = ("move", gate_id, last[2], last[3], x, y)
+            return
+
+        self.push(("move", gate_id, old_x, old_y, x, y))
+        self.gesture_open = True
+
+    def end_gesture(self):
+        self.gesture_open = False
+
+    def undo(self):
+        # returns the entry to invert, or None if there is nothing to undo
+        if not self.undo_stack:
+            return None
+
+        self.gesture_open = False
+
+        entry = self.undo_stack.pop()
+        self.memory -= self.entry_size(entry)
+        self.redo_stack.append(entry)
+        return entry
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        self.memory += self.entry_size(entry)
+        return entry
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.memory = 0
+        self.gesture_open = False
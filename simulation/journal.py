@@ -0,0 +1,192 @@
+import json, logging, os, re, time
+
+from simulation.circuit import Circuit
+
+# A session lives in one directory: session.json with the level, snapshot-<n>.bin and journal-<n>.jsonl with the
+# edits made after that snapshot, one JSON list per line. Compacting writes snapshot-<n + 1>.bin and starts
+# journal-<n + 1>.jsonl, the older files are only deleted once the new snapshot is complete, so recovering
+# always finds a snapshot and every edit after it. A clean exit deletes the directory.
+
+FILE_NAME = re.compile(r"(snapshot|journal)-(\d+)\.(bin|jsonl)$")
+
+class Journal:
+    def __init__(self, directory, flush_interval=1.0, compact_after=10000, submit=None):
+        self.directory = directory
+        self.flush_interval = flush_interval # seconds between writes of the buffered edits
+        self.compact_after = compact_after # edits after which the journal is replaced by a new snapshot
+        self.submit = submit # runs writes in the background in the order they're submitted, like a ThreadPoolExecutor.submit with one worker
+
+        self.generation = max((generation for _, generation in self.files()), default=0)
+        self.file = None
+        self.buffer = []
+        self.edit_count = 0
+        self.last_flush = time.monotonic()
+        self.pending = [] # futures of the background writes, errors takes the finished ones
+
+    def files(self):
+        if not os.path.isdir(self.directory):
+            return []
+
+        return [(file_name, int(match.group(2))) for file_name in os.listdir(self.directory) if (match := FILE_NAME.match(file_name))]
+
+    def snapshot_path(self, generation):
+        return os.path.join(self.directory, f"snapshot-{generation}.bin")
+
+    def journal_path(self, generation):
+        return os.path.join(self.directory, f"journal-{generation}.jsonl")
+
+    def start(self, circuit, level_num):
+        # starts a new session from this circuit, replacing whatever was journaled before
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(os.path.join(self.directory, "session.json"), "w") as file:
+            file.write(json.dumps({"level": level_num}))
+
+        self.compact(circuit)
+
+    def record(self, *edit):
+        if self.file is None:
+            return
+
+        if edit[0] == "move" and self.buffer and self.buffer[-1][0] == "move" and self.buffer[-1][1] == edit[1]:
+            self.buffer[-1] = edit # a drag only needs its latest position
+        else:
+            self.buffer.append(edit)
+            self.edit_count += 1
+
+    def tick(self, circuit):
+        if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+        if self.edit_count >= self.compact_after:
+            self.compact(circuit)
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+
+        if self.file is None or not self.buffer:
+            return
+
+        # the buffer is swapped out here and written and synced in the background, the UI never waits on the disk
+        edits, self.buffer = self.buffer, []
+        self.run(self.write_edits, self.file, edits)
+
+    @staticmethod
+    def write_edits(file, edits):
+        file.write("".join(json.dumps(edit) + "\n" for edit in edits))
+        file.flush()
+        os.fsync(file.fileno())
+
+    def run(self, func, *args):
+        if self.submit is not None:
+            self.pending.append(self.submit(func, *args))
+        else:
+            func(*args)
+
+    def errors(self):
+        # the exceptions of the background writes that failed since the last call
+        errors = []
+
+        for future in [future for future in self.pending if future.done()]:
+            self.pending.remove(future)
+
+            if future.exception() is not None:
+                errors.append(future.exception())
+
+        return errors
+
+    def compact(self, circuit):
+        self.flush()
+        if self.file is not None:
+            self.run(self.file.close) # only after the flush above is written
+
+        self.generation += 1
+        self.file = open(self.journal_path(self.generation), "a")
+        self.edit_count = 0
+
+        self.run(self.write_snapshot, circuit.snapshot(), self.generation)
+
+    def write_snapshot(self, snapshot, generation):
+        snapshot.save(self.snapshot_path(generation) + ".tmp")
+        os.replace(self.snapshot_path(generation) + ".tmp", self.snapshot_path(generation))
+
+        for file_name, file_generation in self.files():
+            if file_generation < generation:
+                os.remove(os.path.join(self.directory, file_name))
+
+    def close(self):
+        # a clean exit, nothing is left to recover
+        if self.file is not None:
+            self.run(self.file.close)
+            self.file = None
+
+        for future in self.pending: # the files are only removed once nothing writes them anymore
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"Writing the recovery journal failed: {e!r}")
+
+        self.pending.clear()
+        self.buffer.clear()
+
+        try:
+            if os.path.isdir(self.directory):
+                for file_name in os.listdir(self.directory):
+                    os.remove(os.path.join(self.directory, file_name))
+                os.rmdir(self.directory)
+        except OSError as e:
+            logging.error(f"Couldn't remove the recovery journal: {e!r}")
+
+    @staticmethod
+    def apply(circuit, edit):
+        # applies an edit without updating values, the circuit is evaluated once after replaying
+        kind, *args = edit
+        gates = circuit.gates
+
+        if kind == "add_gate":
+            circuit.add_gate(args[0], args[1], args[2], text=args[3])
+        elif kind == "remove_gate":
+            circuit.remove_last_gate()
+        elif kind == "add_connection":
+            circuit.connect(*args)
+        elif kind == "disconnect":
+            circuit.disconnect(*args)
+        elif kind == "move":
+            gates[args[0]].x, gates[args[0]].y = args[1], args[2]
+        elif kind == "set_input":
+            gates[args[0]].value = args[1]
+            circuit.netlist_dirty = True
+        elif kind == "label":
+            gates[args[0]].text = args[1]
+        else:
+            raise ValueError(f"Unknown journal edit {kind}")
+
+    @classmethod
+    def recover(cls, directory):
+        # returns (circuit, level number) of a session that didn't exit cleanly, or None
+        journal = cls(directory)
+        files = journal.files()
+        snapshots = [generation for file_name, generation in files if file_name.startswith("snapshot")]
+
+        if not snapshots or not os.path.exists(os.path.join(directory, "session.json")):
+            return None
+
+        with open(os.path.join(directory, "session.json"), "r") as file:
+            level_num = json.load(file)["level"]
+
+        generation = max(snapshots)
+        circuit = Circuit.load(journal.snapshot_path(generation))
+
+        for journal_generation in sorted(file_generation for file_name, file_generation in files if file_name.startswith("journal") and file_generation >= generation):
+            with open(journal.journal_path(journal_generation), "r") as file:
+                for line in file:
+                    try:
+                        edit = json.loads(line)
+                    except ValueError:
+                        break # the last line was cut off by the crash
+
+                    cls.apply(circuit, edit)
+
+        circuit.evaluate()
+
+        return circuit, level_num
@@ -0,0 +1,290 @@
+LEVELS = [
+# EASY
+    [
+        [2, "INPUT"],
+        [1, "AND"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [2, "INPUT"],
+        [1, "OR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [1, "INPUT"],
+        [1, "NOT"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [2, "INPUT"],
+        [1, "NAND"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [2, "INPUT"],
+        [1, "XOR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [2, "INPUT"],
+        [1, "NOT"],
+        [1, "AND"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [3, "INPUT"],
+        [1, "AND"],
+        [1, "OR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [2, "INPUT"],
+        [1, "NOT"],
+        [1, "NAND"],
+        [1, "OUTPUT", 1]
+    ],
+# INTERMEDIATE
+    [
+        [3, "INPUT"],
+        [1, "NOR"],
+        [1, "AND"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [3, "INPUT"],
+        [1, "XNOR"],
+        [1, "OR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [2, "INPUT"],
+        [1, "NOT"],
+        [1, "XOR"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [4, "INPUT"],
+        [1, "OR"],
+        [1, "AND"],
+        [1, "XOR"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [3, "INPUT"],
+        [1, "NOT"],
+        [1, "NOR"],
+        [1, "OR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [4, "INPUT"],
+        [2, "NAND"],
+        [1, "OR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [4, "INPUT"],
+        [2, "NOR"],
+        [1, "AND"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [3, "INPUT"],
+        [1, "NOT"],
+        [1, "AND"],
+        [1, "NAND"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [4, "INPUT"],
+        [2, "XOR"],
+        [1, "XNOR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [4, "INPUT"],
+        [1, "AND"],
+        [1, "NAND"],
+        [1, "OR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [4, "INPUT"],
+        [1, "NOR"],
+        [1, "AND"],
+        [1, "XOR"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [4, "INPUT"],
+        [1, "NOT"],
+        [2, "OR"],
+        [1, "NAND"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [4, "INPUT"],
+        [1, "XNOR"],
+        [1, "NOR"],
+        [1, "AND"],
+        [1, "OUTPUT", 0]
+    ],
+# HARD
+    [
+        [4, "INPUT"],
+        [1, "NOT"],
+        [1, "AND"],
+        [1, "OR"],
+        [1, "XOR"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [5, "INPUT"],
+        [1, "AND"],
+        [1, "OR"],
+        [1, "NAND"],
+        [1, "XOR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [4, "INPUT"],
+        [2, "NOT"],
+        [1, "NAND"],
+        [1, "OR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [4, "INPUT"],
+        [3, "NAND"],
+        [1, "OR"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [4, "INPUT"],
+        [1, "NOT"],
+        [2, "NOR"],
+        [1, "XOR"],
+        [1, "XNOR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [6, "INPUT"],
+        [2, "NOR"],
+        [1, "XOR"],
+        [1, "XNOR"],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [6, "INPUT"],
+        [2, "AND"],
+        [1, "OR"],
+        [1, "NAND"],
+        [1, "XOR"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [5, "INPUT"],
+        [1, "NOT"],
+        [2, "XOR"],
+        [1, "NAND"],
+        [1, "NOR"],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [6, "INPUT"],
+        [2, "XOR"],
+        [1, "NAND"],
+        [1, "NOR"],
+        [1, "XNOR"],
+        [1, "OUTPUT", 1]
+    ],
+# EXTRA HARD
+    [
+        [4, "INPUT"],
+        [1, "AND"],
+        [1, "OR"],
+        [1, "NAND"],
+        [1, "XOR"],
+        [1, "OUTPUT", 0],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [3, "INPUT"],
+        [1, "NOT"],
+        [1, "AND"],
+        [1, "OR"],
+        [1, "XOR"],
+        [1, "OUTPUT", 0],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [6, "INPUT"],
+        [2, "XOR"],
+        [1, "AND"],
+        [1, "NAND"],
+        [1, "OR"],
+        [1, "OUTPUT", 1],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [4, "INPUT"],
+        [2, "NOT"],
+        [1, "NAND"],
+        [1, "NOR"],
+        [1, "XOR"],
+        [1, "OUTPUT", 1],
+        [1, "OUTPUT", 0]
+    ],
+    [
+        [6, "INPUT"],
+        [2, "NOR"],
+        [2, "XNOR"],
+        [1, "AND"],
+        [1, "OR"],
+        [2, "OUTPUT", 1]
+    ],
+    [
+        [6, "INPUT"],
+        [2, "NAND"],
+        [2, "XOR"],
+        [1, "NOR"],
+        [1, "AND"],
+        [1, "OUTPUT", 0],
+        [1, "OUTPUT", 1]
+    ],
+    [
+        [8, "INPUT"],
+        [2, "AND"],
+        [2, "OR"],
+        [1, "XOR"],
+        [1, "NAND"],
+        [1, "NOR"],
+        [1, "XNOR"],
+        [1, "OUTPUT", 1],
+        [1, "OUTPUT", 0]
+    ]
+]
+
+def is_level_completed(level, outputs, process_nodes):
+    # outputs are the values of connected OUTPUT gates, process_nodes the types of gates with both an input and an output
+    outputs = list(outputs)
+    process_nodes = list(process_nodes)
+
+    for requirement in level:
+        if requirement[1] == "INPUT":
+            continue
+
+        if requirement[1] == "OUTPUT":
+            for _ in range(requirement[0]):
+                if not requirement[2] in outputs:
+                    return False
+                else:
+                    outputs.remove(requirement[2])
+        else:
+            for _ in range(requirement[0]):
+                if not requirement[1] in process_nodes:
+                    return False
+                else:
+                    process_nodes.remove(requirement[1])
+
+    return True
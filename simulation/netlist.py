@@ -0,0 +1,391 @@
+from array import array
+from bisect import bisect_left
+from heapq import heappush, heappop
+
+from simulation.gates import LOGICAL_GATES, SINGLE_INPUT_LOGICAL_GATES
+
+OP_NONE = 0 # not enough inputs connected, always None
+OP_INPUT = 1
+OP_BUFFER = 2 # OUTPUT, copies its only input
+OP_UNARY = 3
+OP_BINARY = 4
+OP_MULTI = 5
+
+class Netlist:
+    def __init__(self, gate_types, inputs, values):
+        # gate_types[i] is None for slots which are not logical gates (labels)
+        self.size = len(gate_types)
+        self.gate_types = gate_types
+        self.values = list(values)
+
+        self.ops = array("b", [OP_NONE]) * self.size
+        self.funcs = [None] * self.size
+
+        # a list per gate instead of flat arrays, so wiring edits are patched in place by connect and disconnect
+        self.fanin = [list(inputs[gate_id]) if gate_type is not None else [] for gate_id, gate_type in enumerate(gate_types)]
+        self.fanout = [[] for _ in range(self.size)]
+
+        for gate_id, gate_type in enumerate(gate_types):
+            for input_id in self.fanin[gate_id]:
+                self.fanout[input_id].append(gate_id)
+
+            if gate_type is None:
+                continue
+
+            self.ops[gate_id] = self.get_op(gate_type, len(self.fanin[gate_id]))
+            self.funcs[gate_id] = LOGICAL_GATES.get(gate_type)
+
+        # gates are evaluated one strongly connected component at a time, in topological order.
+        # a component with a feedback loop is settled by bounded fixed-point iteration instead
+        self.sorted_steps = [] # a gate id, or the list of gate ids of a feedback loop. None once edits reordered them
+        self.loops = []
+        self.loop_of = array("l", [-1]) * self.size
+
+        for component in self.strongly_connected_components():
+            if len(component) == 1 and component[0] not in self.fanout[component[0]]:
+                self.sorted_steps.append(component[0])
+                continue
+
+            for gate_id in component:
+                self.loop_of[gate_id] = len(self.loops)
+
+            self.loops.append(component)
+            self.sorted_steps.append(component)
+
+        self.oscillating = [] # loops which didn't settle during the last evaluate or propagate
+
+        # longest path from a source, propagation handles gates in this order so each one is computed at most once.
+        # every gate of a loop shares the level of the loop. edits only ever raise levels, so after a disconnect they
+        # can be higher than the longest path, but a gate still always has a higher level than the gates it reads
+        self.levels = array("l", [0]) * self.size
+        for step in self.sorted_steps:
+            component = [step] if step.__class__ is int else step
+            level = 0
+
+            for gate_id in component:
+                for input_id in self.fanin[gate_id]:
+                    if self.loop_of[input_id] < 0 or self.loop_of[input_id] != self.loop_of[gate_id]:
+                        level = max(level, self.levels[input_id] + 1)
+
+            for gate_id in component:
+                self.levels[gate_id] = level
+
+        # kept sorted by gate id
+        self.output_ids = [gate_id for gate_id in range(self.size) if self.is_output(gate_id)]
+        self.process_ids = [gate_id for gate_id in range(self.size) if self.is_process(gate_id)]
+
+    @property
+    def steps(self):
+        if self.sorted_steps is None: # gates of a level never read each other, so sorting by level is a topological order
+            gate_ids = [gate_id for gate_id in range(self.size) if self.gate_types[gate_id] is not None and self.loop_of[gate_id] < 0]
+            self.sorted_steps = sorted(gate_ids + self.loops, key=lambda step: self.levels[step if step.__class__ is int else step[0]])
+
+        return self.sorted_steps
+
+    @property
+    def process_types(self):
+        return [self.gate_types[gate_id] for gate_id in self.process_ids]
+
+    def is_output(self, gate_id):
+        return self.gate_types[gate_id] == "OUTPUT" and self.ops[gate_id] == OP_BUFFER
+
+    def is_process(self, gate_id):
+        # gates with both an input and an output, what levels count
+        return self.gate_types[gate_id] not in (None, "INPUT", "OUTPUT") and bool(self.fanin[gate_id]) and bool(self.fanout[gate_id])
+
+    def update_lists(self, gate_id):
+        for gate_ids, included in ((self.output_ids, self.is_output(gate_id)), (self.process_ids, self.is_process(gate_id))):
+            index = bisect_left(gate_ids, gate_id)
+            listed = index < len(gate_ids) and gate_ids[index] == gate_id
+
+            if included and not listed:
+                gate_ids.insert(index, gate_id)
+            elif listed and not included:
+                del gate_ids[index]
+
+    def add_gate(self, gate_type, value):
+        # a new gate has no wires, so nothing else changes and it can be evaluated last
+        gate_id = self.size
+        self.size += 1
+
+        self.gate_types.append(gate_type)
+        self.values.append(value)
+        self.ops.append(self.get_op(gate_type, 0) if gate_type is not None else OP_NONE)
+        self.funcs.append(LOGICAL_GATES.get(gate_type))
+        self.fanin.append([])
+        self.fanout.append([])
+        self.loop_of.append(-1)
+        self.levels.append(0)
+
+        if self.sorted_steps is not None and gate_type is not None:
+            self.sorted_steps.append(gate_id)
+
+    def remove_last_gate(self):
+        # undoes add_gate, the gate has no wires left
+        self.size -= 1
+        gate_id = self.size
+
+        if self.sorted_steps is not None and self.gate_types[gate_id] is not None:
+            self.sorted_steps.remove(gate_id)
+
+        for values in (self.gate_types, self.values, self.ops, self.funcs, self.fanin, self.fanout, self.loop_of, self.levels):
+            values.pop()
+
+    def reaches(self, source_id, target_id):
+        # levels never drop along a wire, so gates above target_id's level can't lead to it
+        limit = self.levels[target_id]
+        seen = {source_id}
+        stack = [source_id]
+
+        while stack:
+            gate_id = stack.pop()
+            if gate_id == target_id:
+                return True
+
+            for output_id in self.fanout[gate_id]:
+                if output_id not in seen and self.levels[output_id] <= limit:
+                    seen.add(output_id)
+                    stack.append(output_id)
+
+        return False
+
+    def raise_level(self, gate_id, level):
+        # the gates after gate_id are raised as far as needed to stay above the gates they read
+        stack = [(gate_id, level)]
+
+        while stack:
+            gate_id, level = stack.pop()
+            if self.levels[gate_id] >= level:
+                continue
+
+            loop = self.loop_of[gate_id]
+            component = self.loops[loop] if loop >= 0 else (gate_id,)
+
+            for member_id in component:
+                self.levels[member_id] = level
+
+            for member_id in component:
+                for output_id in self.fanout[member_id]:
+                    if loop < 0 or self.loop_of[output_id] != loop:
+                        stack.append((output_id, level + 1))
+
+    def connect(self, output_id, input_id, input_index=None):
+        # patches the wire in, returns False without changing anything if it's part of a feedback loop. the loop's
+        # components have to be found again, the order its gates are settled in changes with its wires
+        if output_id == input_id or self.reaches(input_id, output_id):
+            return False
+
+        gate_inputs = self.fanin[input_id]
+        gate_inputs.insert(len(gate_inputs) if input_index is None else input_index, output_id)
+        self.fanout[output_id].append(input_id)
+
+        self.ops[input_id] = self.get_op(self.gate_types[input_id], len(gate_inputs))
+
+        self.raise_level(input_id, self.levels[output_id] + 1)
+        self.sorted_steps = None # the new wire can go against the old order even where levels didn't change
+
+        self.update_lists(output_id)
+        self.update_lists(input_id)
+        return True
+
+    def disconnect(self, output_id, input_id):
+        # patches the wire out, returns False without changing anything if it's part of a feedback loop, which
+        # might not be a loop anymore
+        loop = self.loop_of[output_id]
+        if loop >= 0 and loop == self.loop_of[input_id]:
+            return False
+
+        self.fanin[input_id].remove(output_id)
+        self.fanout[output_id].remove(input_id)
+
+        self.ops[input_id] = self.get_op(self.gate_types[input_id], len(self.fanin[input_id]))
+
+        self.update_lists(output_id)
+        self.update_lists(input_id)
+        return True
+
+    @staticmethod
+    def get_op(gate_type, input_count):
+        if gate_type == "INPUT":
+            return OP_INPUT
+        elif gate_type == "OUTPUT":
+            return OP_BUFFER if input_count else OP_NONE
+        elif gate_type in SINGLE_INPUT_LOGICAL_GATES:
+            return OP_UNARY if input_count == 1 else OP_NONE
+        elif input_count == 2:
+            return OP_BINARY
+        elif input_count > 2:
+            return OP_MULTI
+        return OP_NONE
+
+    def strongly_connected_components(self):
+        # iterative Tarjan, so long chains don't use up the Python stack. returns the components in topological order
+        index = array("l", [-1]) * self.size
+        low = array("l", [0]) * self.size
+        on_stack = bytearray(self.size)
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(self.size):
+            if self.gate_types[root] is None or index[root] != -1:
+                continue
+
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [[root, 0]] # gate id, index of its next output
+
+            while work:
+                frame = work[-1]
+                gate_id = frame[0]
+
+                if frame[1] < len(self.fanout[gate_id]):
+                    output_id = self.fanout[gate_id][frame[1]]
+                    frame[1] += 1
+
+                    if index[output_id] == -1:
+                        index[output_id] = low[output_id] = counter
+                        counter += 1
+                        stack.append(output_id)
+                        on_stack[output_id] = 1
+                        work.append([output_id, 0])
+                    elif on_stack[output_id]:
+                        low[gate_id] = min(low[gate_id], index[output_id])
+                    continue
+
+                work.pop()
+                if work:
+                    parent_id = work[-1][0]
+                    low[parent_id] = min(low[parent_id], low[gate_id])
+
+                if low[gate_id] == index[gate_id]:
+                    component = []
+                    while True:
+                        member_id = stack.pop()
+                        on_stack[member_id] = 0
+                        component.append(member_id)
+                        if member_id == gate_id:
+                            break
+
+                    component.reverse() # discovery order, roughly the direction signals travel around the loop
+                    components.append(component)
+
+        components.reverse()
+        return components
+
+    def compute(self, gate_id):
+        op = self.ops[gate_id]
+        values = self.values
+
+        if op == OP_INPUT:
+            return values[gate_id]
+        elif op == OP_NONE:
+            return None
+
+        inputs = self.fanin[gate_id]
+
+        if op == OP_BUFFER:
+            return values[inputs[0]]
+        elif op == OP_UNARY:
+            value = values[inputs[0]]
+            return int(self.funcs[gate_id](value)) if value is not None else None
+        elif op == OP_BINARY:
+            value = self.funcs[gate_id](values[inputs[0]], values[inputs[1]])
+            return int(value) if value is not None else value # have to convert to int cause it might return boolean
+
+        func = self.funcs[gate_id]
+        value = values[inputs[0]]
+        for input_id in inputs[1:]:
+            value = func(value, values[input_id])
+        return value
+
+    def set_input(self, gate_id, value):
+        self.values[gate_id] = value
+
+    def settle(self, component):
+        # gauss-seidel sweeps starting from the current values, so latches keep their state.
+        # a loop which still changes after the bound is oscillating and becomes None
+        values = self.values
+        compute = self.compute
+
+        for _ in range(2 * len(component) + 2):
+            changed = False
+
+            for gate_id in component:
+                value = compute(gate_id)
+                if value != values[gate_id]:
+                    values[gate_id] = value
+                    changed = True
+
+            if not changed:
+                return True
+
+        for gate_id in component:
+            values[gate_id] = None
+
+        self.oscillating.append(component)
+        return False
+
+    def evaluate(self):
+        values = self.values
+        compute = self.compute
+        self.oscillating = []
+
+        for step in self.steps:
+            if step.__class__ is int:
+                values[step] = compute(step)
+            else:
+                self.settle(step)
+
+        return values
+
+    def propagate(self, gate_ids):
+        # re-evaluates only the fan-out cone of gate_ids, stopping wherever a value doesn't change
+        values = self.values
+        levels = self.levels
+        loop_of = self.loop_of
+        compute = self.compute
+        self.oscillating = []
+
+        queue = []
+        queued = bytearray(self.size)
+        settled = bytearray(len(self.loops))
+        forced = set(gate_ids)
+        changed = []
+
+        for gate_id in forced:
+            heappush(queue, (levels[gate_id], gate_id))
+            queued[gate_id] = 1
+
+        while queue:
+            _, gate_id = heappop(queue)
+            loop = loop_of[gate_id]
+
+            if loop < 0:
+                value = compute(gate_id)
+                if value == values[gate_id] and gate_id not in forced:
+                    continue
+
+                values[gate_id] = value
+                updated = (gate_id,)
+            else:
+                if settled[loop]:
+                    continue
+                settled[loop] = 1
+
+                component = self.loops[loop]
+                previous = [values[member_id] for member_id in component]
+                self.settle(component)
+                updated = [member_id for member_id, value in zip(component, previous) if value != values[member_id] or member_id in forced]
+
+            for updated_id in updated:
+                changed.append(updated_id)
+
+                for output_id in self.fanout[updated_id]:
+                    if not queued[output_id] and (loop < 0 or loop_of[output_id] != loop):
+                        heappush(queue, (levels[output_id], output_id))
+                        queued[output_id] = 1
+
+        return changed
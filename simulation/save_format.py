@@ -0,0 +1,125 @@
+import mmap, struct, sys
+
+from array import array
+
+# Binary saves are laid out as:
+#   header        magic, format version, level, gate count, edge count, string table size
+#   gate records  one fixed width record per gate, the gate id is the record index
+#   edge table    (output id, input id) pairs, grouped by input gate in the order of its inputs
+#   string table  utf-8 text of the LABELs, records point into it with (offset, length)
+# Everything is little endian, so the sections can be read straight out of a memory mapped file.
+
+MAGIC = b"LGSV"
+VERSION = 2 # 2 added the level, version 1 files leave it as padding
+
+HEADER = struct.Struct("<4sHhIII")
+GATE_RECORD = struct.Struct("<ddBbxxiII") # x, y, gate type, value, output, text offset, text length
+
+GATE_TYPES = ["AND", "OR", "NAND", "NOR", "XOR", "XNOR", "NOT", "INPUT", "OUTPUT", "LABEL"] # only ever append to this
+GATE_TYPE_INDEXES = {gate_type: index for index, gate_type in enumerate(GATE_TYPES)}
+
+NO_VALUE = -1 # None value or output
+NO_LEVEL = -2 # level -1 is DIY mode
+
+def is_binary_save(path):
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+def read_header(path):
+    # (level, gate count) of a binary save without reading the gates, the level is None if it wasn't recorded.
+    # the gate count includes LABELs
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a save")
+
+    magic, version, level, gate_count, *_ = HEADER.unpack(header)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a binary save")
+
+    return (level if version >= 2 and level != NO_LEVEL else None), gate_count
+
+def write_circuit(circuit, path, level=None):
+    strings = bytearray()
+    edges = array("I")
+    edge_count = 0
+
+    data = bytearray(HEADER.size + GATE_RECORD.size * len(circuit.gates))
+    offset = HEADER.size
+
+    for gate in circuit.gates:
+        text_offset = text_length = 0
+
+        if gate.gate_type == "LABEL":
+            text = (gate.text or "").encode("utf-8")
+            text_offset, text_length = len(strings), len(text)
+            strings += text
+        else:
+            for input_id in gate.input:
+                edges.append(input_id)
+                edges.append(gate.id)
+            edge_count += len(gate.input)
+
+        value = NO_VALUE if gate.value is None else int(gate.value)
+        output = NO_VALUE if gate.output is None else gate.output
+
+        GATE_RECORD.pack_into(data, offset, gate.x, gate.y, GATE_TYPE_INDEXES[gate.gate_type], value, output, text_offset, text_length)
+        offset += GATE_RECORD.size
+
+    HEADER.pack_into(data, 0, MAGIC, VERSION, NO_LEVEL if level is None else level, len(circuit.gates), edge_count, len(strings))
+
+    if sys.byteorder != "little":
+        edges.byteswap()
+
+    with open(path, "wb") as file:
+        file.write(data)
+        file.write(edges)
+        file.write(strings)
+
+def read_circuit(path, circuit_class):
+    # the gates keep the values they were saved with, nothing is compiled or evaluated here.
+    # records are unpacked straight out of the mapped file, the memoryview has to be released before it's unmapped
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as data:
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a save")
+
+        magic, version, _, gate_count, edge_count, strings_size = HEADER.unpack_from(data, 0)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary save")
+        if version > VERSION:
+            raise ValueError(f"{path} was saved by a newer version (format {version}, this one reads up to {VERSION})")
+
+        edges_offset = HEADER.size + GATE_RECORD.size * gate_count
+        strings_offset = edges_offset + 8 * edge_count
+
+        if len(data) != strings_offset + strings_size:
+            raise ValueError(f"{path} is truncated or corrupted")
+
+        circuit = circuit_class()
+        add_gate = circuit.add_gate
+
+        for x, y, type_index, value, output, text_offset, text_length in GATE_RECORD.iter_unpack(data[HEADER.size:edges_offset]):
+            gate_type = GATE_TYPES[type_index]
+
+            if gate_type != "LABEL":
+                gate = add_gate(x, y, gate_type, value if value != NO_VALUE else None)
+                gate.output = output if output != NO_VALUE else None
+            else:
+                add_gate(x, y, "LABEL", text=str(data[strings_offset + text_offset:strings_offset + text_offset + text_length], "utf-8"))
+
+        edges = array("I")
+        edges.frombytes(data[edges_offset:strings_offset])
+
+    if sys.byteorder != "little":
+        edges.byteswap()
+
+    gates = circuit.gates
+    for i in range(0, len(edges), 2):
+        output_id, input_id = edges[i], edges[i + 1]
+        gates[input_id].input.append(output_id)
+        circuit.connections[output_id, input_id] = None
+
+    return circuit
@@ -0,0 +1,157 @@
+import json, math, os
+
+from PIL import Image, ImageDraw
+
+from simulation.circuit import Circuit
+from simulation.save_format import is_binary_save, read_header
+
+# The index of a saves directory lives in its .index directory: index.json with the gate count, level and
+# timestamp of every save, and a small PNG thumbnail per save. An entry is reused while its file keeps the same
+# mtime and size, and saves are only indexed when a page showing them is opened. The level of a binary save comes
+# from its header, loading it to count its gates and draw the thumbnail is submitted to run in the background and
+# poll adds the results, so opening the Load dialog costs a directory listing and a header read per save.
+# Gate counts leave out LABELs, like everywhere else, so they can't come from the header.
+
+INDEX_VERSION = 2
+THUMBNAIL_SIZE = (96, 54)
+THUMBNAIL_BACKGROUND = (30, 30, 47)
+
+def render_thumbnail(circuit, size=THUMBNAIL_SIZE):
+    image = Image.new("RGB", size, THUMBNAIL_BACKGROUND)
+    gates = [gate for gate in circuit.gates if gate.gate_type != "LABEL"]
+
+    if not gates:
+        return image
+
+    margin = 4
+    min_x, max_x = min(gate.x for gate in gates), max(gate.x for gate in gates)
+    min_y, max_y = min(gate.y for gate in gates), max(gate.y for gate in gates)
+    scale = min((size[0] - 2 * margin) / max(max_x - min_x, 1), (size[1] - 2 * margin) / max(max_y - min_y, 1))
+
+    def project(gate): # world y points up, image y points down
+        return margin + (gate.x - min_x) * scale, size[1] - margin - (gate.y - min_y) * scale
+
+    draw = ImageDraw.Draw(image)
+
+    for output_id, input_id in circuit.connections:
+        draw.line([project(circuit.gates[output_id]), project(circuit.gates[input_id])], fill=(200, 200, 200))
+
+    for gate in gates:
+        x, y = project(gate)
+        draw.rectangle((x - 1, y - 1, x + 1, y + 1), fill=(49, 154, 54) if gate.value else (128, 128, 128))
+
+    return image
+
+def index_circuit(path, thumbnail_path):
+    # the part of an entry which needs the save loaded, runs in the background
+    try:
+        circuit = Circuit.load(path)
+    except (OSError, ValueError, TypeError, IndexError, KeyError) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+    render_thumbnail(circuit).save(thumbnail_path)
+
+    return {"gates": sum(1 for gate in circuit.gates if gate.gate_type != "LABEL"), "thumbnail": thumbnail_path}
+
+class SaveIndex:
+    def __init__(self, directory, submit=None):
+        self.directory = directory
+        self.index_dir = os.path.join(directory, ".index")
+        self.submit = submit # runs index_circuit in the background, like ThreadPoolExecutor.submit
+        self.entries = {}
+        self.pending = {} # save name -> future of its index_circuit
+        self.files = {}
+        self.names = [] # newest first
+        self.dirty = False
+
+        try:
+            with open(os.path.join(self.index_dir, "index.json"), "r") as file:
+                data = json.load(file)
+
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data["saves"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass # a missing or broken index is rebuilt as pages are opened
+
+    def thumbnail_path(self, name):
+        return os.path.join(self.index_dir, f"{name}.png")
+
+    def refresh(self):
+        # lists the directory, dropping the entries of saves that were deleted or changed since they were indexed
+        self.files = {}
+
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith((".json", ".bin")):
+                    stat = entry.stat()
+                    self.files[entry.name] = (stat.st_mtime, stat.st_size)
+
+        for name, entry in list(self.entries.items()):
+            if self.files.get(name) != (entry["mtime"], entry["size"]):
+                del self.entries[name]
+                self.dirty = True
+
+                if os.path.exists(self.thumbnail_path(name)):
+                    os.remove(self.thumbnail_path(name))
+
+        self.names = sorted(self.files, key=lambda name: (self.files[name][0], name), reverse=True)
+
+    def page_count(self, page_size):
+        return max(1, math.ceil(len(self.names) / page_size))
+
+    def page(self, page, page_size):
+        return [(name, self.get(name)) for name in self.names[page * page_size:(page + 1) * page_size]]
+
+    def get(self, name):
+        if name not in self.entries:
+            self.entries[name] = self.index_save(name)
+            self.dirty = True
+
+        return self.entries[name]
+
+    def index_save(self, name):
+        path = os.path.join(self.directory, name)
+        mtime, size = self.files[name]
+        entry = {"mtime": mtime, "size": size, "gates": None, "level": None, "thumbnail": None, "error": None}
+
+        try:
+            if is_binary_save(path): # a JSON save has no level
+                entry["level"] = read_header(path)[0]
+        except (OSError, ValueError) as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+            return entry
+
+        if self.submit is not None:
+            self.pending[name] = self.submit(index_circuit, path, self.thumbnail_path(name))
+        else:
+            entry.update(index_circuit(path, self.thumbnail_path(name)))
+
+        return entry
+
+    def poll(self):
+        # adds the finished index_circuit results to their entries, returns whether there were any
+        done = [name for name, future in self.pending.items() if future.done()]
+
+        for name in done:
+            result = self.pending.pop(name).result()
+
+            if name in self.entries: # unless refresh dropped it meanwhile
+                self.entries[name].update(result)
+                self.dirty = True
+
+        return bool(done)
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        index_path = os.path.join(self.index_dir, "index.json")
+        entries = {name: entry for name, entry in self.entries.items() if name not in self.pending} # indexed again next time
+
+        with open(index_path + ".tmp", "w") as file:
+            file.write(json.dumps({"version": INDEX_VERSION, "saves": entries}))
+        os.replace(index_path + ".tmp", index_path)
+
+        self.dirty = False
@@ -0,0 +1,169 @@
+import sys, time
+
+from functools import lru_cache
+from itertools import product
+from math import comb
+
+from simulation.gates import LOGICAL_GATES, SINGLE_INPUT_LOGICAL_GATES
+from simulation.levels import LEVELS
+
+# Every gate (and INPUT) has at most 1 output, so a finished level is a forest of read-once trees,
+# one per OUTPUT, whose leaves are distinct INPUTs. Since the leaves never overlap, each tree can be
+# summarised by the set of values it can reach, and the trees can be combined independently.
+# Gates of the same type and all INPUTs are interchangeable and the order of a gate's two inputs
+# only depends on which one the player connects first, so wirings are counted up to those symmetries.
+
+INPUT_VALUES = frozenset((None, 0, 1)) # an INPUT starts as None until it's clicked
+
+def apply_gate(gate_type, values):
+    if len(values) == 1:
+        if gate_type not in SINGLE_INPUT_LOGICAL_GATES:
+            return None # 2 input gates with 1 connected input stay None
+        return int(LOGICAL_GATES[gate_type](values[0])) if values[0] is not None else None
+
+    value = LOGICAL_GATES[gate_type](*values)
+    return int(value) if value is not None else value
+
+@lru_cache(maxsize=None)
+def combine(gate_type, *children):
+    if len(children) == 1:
+        return frozenset(apply_gate(gate_type, (a,)) for a in children[0])
+
+    a_values, b_values = children
+    return frozenset(apply_gate(gate_type, pair) for a in a_values for b in b_values for pair in ((a, b), (b, a)))
+
+class LevelSolver:
+    def __init__(self, level):
+        self.input_count = sum(requirement[0] for requirement in level if requirement[1] == "INPUT")
+        self.targets = sorted(requirement[2] for requirement in level if requirement[1] == "OUTPUT" for _ in range(requirement[0]))
+
+        self.gate_types = [gate_type for gate_type in LOGICAL_GATES if any(requirement[1] == gate_type for requirement in level)]
+        self.gate_counts = tuple(sum(requirement[0] for requirement in level if requirement[1] == gate_type) for gate_type in self.gate_types)
+
+    def max_leaves(self, counts):
+        return 1 + sum(count for gate_type, count in zip(self.gate_types, counts) if gate_type not in SINGLE_INPUT_LOGICAL_GATES)
+
+    @lru_cache(maxsize=None)
+    def trees(self, counts, leaves):
+        # every tree using exactly these gates and INPUTs, as {reachable values: [wiring count, example]}
+        if not any(counts):
+            return {INPUT_VALUES: [1, "INPUT"]} if leaves == 1 else {}
+
+        if leaves < 1 or leaves > self.max_leaves(counts):
+            return {}
+
+        result = {}
+
+        for type_index, gate_type in enumerate(self.gate_types):
+            if not counts[type_index]:
+                continue
+
+            rest = counts[:type_index] + (counts[type_index] - 1,) + counts[type_index + 1:]
+
+            for values, (count, example) in self.trees(rest, leaves).items():
+                self.add(result, combine(gate_type, values) if gate_type in SINGLE_INPUT_LOGICAL_GATES else frozenset((None,)), count, f"{gate_type}({example})")
+
+            if gate_type in SINGLE_INPUT_LOGICAL_GATES:
+                continue
+
+            for first_counts in product(*(range(count + 1) for count in rest)):
+                second_counts = tuple(count - first for count, first in zip(rest, first_counts))
+
+                for first_leaves in range(1, leaves):
+                    first, second = (first_counts, first_leaves), (second_counts, leaves - first_leaves)
+                    if first > second:
+                        continue
+
+                    first_trees, second_trees = self.trees(*first), self.trees(*second)
+                    if not first_trees or not second_trees:
+                        continue
+
+                    if first == second:
+                        pairs = []
+                        keys = list(first_trees)
+                        for i, a in enumerate(keys):
+                            count = first_trees[a][0]
+                            pairs.append((a, a, count * (count + 1) // 2))
+                            pairs.extend((a, b, count * first_trees[b][0]) for b in keys[i + 1:])
+                    else:
+                        pairs = [(a, b, first_trees[a][0] * second_trees[b][0]) for a in first_trees for b in second_trees]
+
+                    for a, b, count in pairs:
+                        self.add(result, combine(gate_type, a, b), count, f"{gate_type}({first_trees[a][1]}, {second_trees[b][1]})")
+
+        return result
+
+    @staticmethod
+    def add(result, values, count, example):
+        if values in result:
+            result[values][0] += count
+        else:
+            result[values] = [count, example]
+
+    def matching(self, counts, leaves, target):
+        # trees with this shape that can make their OUTPUT equal target
+        trees = [tree for values, tree in self.trees(counts, leaves).items() if target in values]
+        return sum(tree[0] for tree in trees), (trees[0][1] if trees else None)
+
+    def solve(self):
+        # returns (number of wirings, one example wiring as a list of OUTPUT expressions)
+        return self.forest(0, self.gate_counts, self.input_count, None)
+
+    @lru_cache(maxsize=None)
+    def forest(self, output_index, counts, leaves, previous):
+        if output_index == len(self.targets):
+            return (1, ()) if not any(counts) else (0, None)
+
+        target = self.targets[output_index]
+        same_target = self.targets[output_index:].count(target)
+
+        total, example = 0, None
+
+        # OUTPUTs with the same target are interchangeable, so their trees are picked as a multiset
+        # in non-decreasing shape order, a shape picked r times at once
+        for tree_counts in product(*(range(count + 1) for count in counts)):
+            for tree_leaves in range(1, leaves + 1):
+                shape = (tree_counts, tree_leaves)
+                if previous is not None and shape <= previous:
+                    continue
+
+                tree_total, tree_example = self.matching(tree_counts, tree_leaves, target)
+                if not tree_total:
+                    continue
+
+                for repeat in range(1, same_target + 1):
+                    rest_counts = tuple(count - tree_count * repeat for count, tree_count in zip(counts, tree_counts))
+                    rest_leaves = leaves - tree_leaves * repeat
+                    if min(rest_counts) < 0 or rest_leaves < 0:
+                        break
+
+                    next_previous = shape if repeat < same_target else None
+                    rest_total, rest_example = self.forest(output_index + repeat, rest_counts, rest_leaves, next_previous)
+                    if not rest_total:
+                        continue
+
+                    total += comb(tree_total + repeat - 1, repeat) * rest_total
+                    if example is None:
+                        example = (f"OUTPUT({tree_example})",) * repeat + rest_example
+
+        return total, example
+
+def verify_levels(levels=LEVELS):
+    return [LevelSolver(level).solve() for level in levels]
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    unsolvable = []
+
+    for level_num, (solution_count, example) in enumerate(verify_levels()):
+        if solution_count:
+            print(f"Level {level_num + 1}: {solution_count} solution(s), e.g. {', '.join(example)}")
+        else:
+            print(f"Level {level_num + 1}: UNSOLVABLE")
+            unsolvable.append(level_num + 1)
+
+    print(f"Checked {len(LEVELS)} levels in {time.perf_counter() - start:.2f}s")
+
+    if unsolvable:
+        print(f"Unsolvable levels: {', '.join(map(str, unsolvable))}")
+        sys.exit(1)
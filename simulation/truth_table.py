@@ -0,0 +1,168 @@
+from simulation.netlist import OP_NONE, OP_INPUT, OP_BUFFER, OP_UNARY
+
+
+# every value is a pair of bit vectors over all input combinations: (rows where it's 1, rows where it's None),
+# rows in neither are 0. the ops below follow LOGICAL_GATES exactly, including how None behaves in them
+
+def bitwise_and(a, b, full): # a and b
+    return a[0] & b[0], a[1] | (a[0] & b[1])
+
+def bitwise_or(a, b, full): # a or b
+    return a[0] | b[0], ~a[0] & b[1]
+
+def bitwise_equal(a, b, full):
+    a_zero = full & ~(a[0] | a[1])
+    b_zero = full & ~(b[0] | b[1])
+    return (a[0] & b[0]) | (a[1] & b[1]) | (a_zero & b_zero)
+
+BITWISE_GATES = {
+    "AND": bitwise_and,
+    "OR": bitwise_or,
+    "NAND": lambda a, b, full: (full & ~bitwise_and(a, b, full)[0], 0),
+    "NOR": lambda a, b, full: (full & ~bitwise_or(a, b, full)[0], 0),
+    "XOR": lambda a, b, full: (full & ~bitwise_equal(a, b, full), 0),
+    "XNOR": lambda a, b, full: (bitwise_equal(a, b, full), 0),
+    "NOT": lambda a, full: (full & ~(a[0] | a[1]), a[1]),
+}
+
+def input_pattern(bit, row_count):
+    # row k has this INPUT set to (k >> bit) & 1
+    block = 1 << bit
+    pattern = ((1 << block) - 1) << block
+    period = block * 2
+
+    while period < row_count:
+        pattern |= pattern << period
+        period *= 2
+
+    return pattern
+
+class TruthTable:
+    def __init__(self, netlist):
+        self.netlist = netlist
+
+        self.input_ids = [gate_id for gate_id in range(netlist.size) if netlist.ops[gate_id] == OP_INPUT]
+        self.output_ids = [gate_id for gate_id in range(netlist.size) if netlist.gate_types[gate_id] == "OUTPUT"]
+
+        self.row_count = 1 << len(self.input_ids)
+        self.full = (1 << self.row_count) - 1
+
+        self.words = [None] * netlist.size
+        self.simulate()
+
+    def simulate(self):
+        netlist = self.netlist
+        words = self.words
+        fanin = netlist.fanin
+
+        # the first INPUT is the most significant column, like a hand-written truth table
+        for i, gate_id in enumerate(self.input_ids):
+            words[gate_id] = (input_pattern(len(self.input_ids) - 1 - i, self.row_count), 0)
+
+        # every other gate's words are dropped after the last step that reads them, so only the inputs and outputs
+        # stay around instead of a row_count bit vector per gate
+        last_step = {}
+        for index, step in enumerate(netlist.steps):
+            for gate_id in ((step,) if step.__class__ is int else step):
+                last_step[gate_id] = index
+                for input_id in fanin[gate_id]:
+                    last_step[input_id] = index
+
+        kept = set(self.input_ids) | set(self.output_ids)
+        released = [[] for _ in netlist.steps]
+        for gate_id, index in last_step.items():
+            if gate_id not in kept:
+                released[index].append(gate_id)
+
+        for index, step in enumerate(netlist.steps):
+            if step.__class__ is int:
+                words[step] = self.compute(step)
+            else:
+                self.settle(step)
+
+            for gate_id in released[index]:
+                words[gate_id] = None
+
+    def compute(self, gate_id):
+        netlist = self.netlist
+        words = self.words
+
+        op = netlist.ops[gate_id]
+        inputs = netlist.fanin[gate_id]
+
+        if op == OP_INPUT:
+            return words[gate_id]
+        elif op == OP_NONE:
+            return (0, self.full)
+        elif op == OP_BUFFER:
+            return words[inputs[0]]
+        elif op == OP_UNARY:
+            return BITWISE_GATES[netlist.gate_types[gate_id]](words[inputs[0]], self.full)
+
+        func = BITWISE_GATES[netlist.gate_types[gate_id]]
+        word = words[inputs[0]]
+        for input_id in inputs[1:]:
+            word = func(word, words[input_id], self.full)
+        return word
+
+    def settle(self, component):
+        # every row is iterated at once, rows still changing after the bound are oscillating and become None
+        netlist = self.netlist
+        words = self.words
+        full = self.full
+        changing = 0
+
+        # feedback loops start from the circuit's current values, like Netlist.settle
+        for gate_id in component:
+            value = netlist.values[gate_id]
+            words[gate_id] = (full if value else 0, full if value is None else 0)
+
+        for _ in range(2 * len(component) + 2):
+            changing = 0
+
+            for gate_id in component:
+                word = self.compute(gate_id)
+                changing |= (word[0] ^ words[gate_id][0]) | (word[1] ^ words[gate_id][1])
+                words[gate_id] = word
+
+            if not changing:
+                return
+
+        for gate_id in component:
+            one, none = words[gate_id]
+            words[gate_id] = (one & ~changing, none | changing)
+
+    def value(self, gate_id, row):
+        one, none = self.words[gate_id]
+
+        if (none >> row) & 1:
+            return None
+        return (one >> row) & 1
+
+    def column(self, gate_id):
+        # one character per row, "1", "0" or "N" for None
+        one, none = self.words[gate_id]
+        ones = format(one, f"0{self.row_count}b")[::-1]
+
+        if not none:
+            return ones
+
+        chars = bytearray(ones, "ascii")
+        nones = format(none, f"0{self.row_count}b")[::-1]
+
+        row = nones.find("1")
+        while row != -1:
+            chars[row] = ord("N")
+            row = nones.find("1", row + 1)
+
+        return chars.decode("ascii")
+
+    def write_csv(self, file):
+        gate_ids = self.input_ids + self.output_ids
+        columns = [self.column(gate_id) for gate_id in gate_ids]
+
+        file.write(",".join(f"{self.netlist.gate_types[gate_id]} {gate_id}" for gate_id in gate_ids) + "\n")
+
+        for start in range(0, self.row_count, 65536):
+            rows = zip(*(column[start:start + 65536] for column in columns))
+            file.write("\n".join(",".join(row) for row in rows).replace("N", "None") + "\n")
@@ -3,291 +3,18 @@ from arcade.types import Color
 from arcade.gui.widgets.buttons import UITextureButtonStyle, UIFlatButtonStyle
 from arcade.gui.widgets.slider import UISliderStyle
 
+from simulation.gates import SINGLE_INPUT_LOGICAL_GATES, LOGICAL_GATES
+from simulation.levels import LEVELS
+
 log_dir = 'logs'
 save_dir = 'saves'
+recovery_dir = 'recovery'
+cache_dir = 'cache'
+undo_memory_budget = 4 * 1024 * 1024 # bytes of undo history kept per game
 
 menu_background_color = (30, 30, 47)
 discord_presence_id = 1427213145667276840
 
-SINGLE_INPUT_LOGICAL_GATES = ["NOT", "OUTPUT"]
-
-LOGICAL_GATES = {
-    "AND": lambda a, b: a and b,
-    "OR": lambda a, b: a or b,
-    "NAND": lambda a, b: not (a and b),
-    "NOR": lambda a, b: not (a or b),
-    "XOR": lambda a, b: a != b,
-    "XNOR": lambda a, b: a == b,
-    "NOT": lambda a: not a,
-}
-
-LEVELS = [
-# EASY
-    [
-        [2, "INPUT"],
-        [1, "AND"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [2, "INPUT"],
-        [1, "OR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [1, "INPUT"],
-        [1, "NOT"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [2, "INPUT"],
-        [1, "NAND"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [2, "INPUT"],
-        [1, "XOR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [2, "INPUT"],
-        [1, "NOT"],
-        [1, "AND"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [3, "INPUT"],
-        [1, "AND"],
-        [1, "OR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [2, "INPUT"],
-        [1, "NOT"],
-        [1, "NAND"],
-        [1, "OUTPUT", 1]
-    ],
-# INTERMEDIATE
-    [
-        [3, "INPUT"],
-        [1, "NOR"],
-        [1, "AND"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [3, "INPUT"],
-        [1, "XNOR"],
-        [1, "OR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [2, "INPUT"],
-        [1, "NOT"],
-        [1, "XOR"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [4, "INPUT"],
-        [1, "OR"],
-        [1, "AND"],
-        [1, "XOR"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [3, "INPUT"],
-        [1, "NOT"],
-        [1, "NOR"],
-        [1, "OR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [4, "INPUT"],
-        [2, "NAND"],
-        [1, "OR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [4, "INPUT"],
-        [2, "NOR"],
-        [1, "AND"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [3, "INPUT"],
-        [1, "NOT"],
-        [1, "AND"],
-        [1, "NAND"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [4, "INPUT"],
-        [2, "XOR"],
-        [1, "XNOR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [4, "INPUT"],
-        [1, "AND"],
-        [1, "NAND"],
-        [1, "OR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [4, "INPUT"],
-        [1, "NOR"],
-        [1, "AND"],
-        [1, "XOR"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [4, "INPUT"],
-        [1, "NOT"],
-        [2, "OR"],
-        [1, "NAND"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [4, "INPUT"],
-        [1, "XNOR"],
-        [1, "NOR"],
-        [1, "AND"],
-        [1, "OUTPUT", 0]
-    ],
-# HARD
-    [
-        [4, "INPUT"],
-        [1, "NOT"],
-        [1, "AND"],
-        [1, "OR"],
-        [1, "XOR"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [5, "INPUT"],
-        [1, "AND"],
-        [1, "OR"],
-        [1, "NAND"],
-        [1, "XOR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [4, "INPUT"],
-        [2, "NOT"],
-        [1, "NAND"],
-        [1, "OR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [4, "INPUT"],
-        [3, "NAND"],
-        [1, "OR"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [4, "INPUT"],
-        [1, "NOT"],
-        [2, "NOR"],
-        [1, "XOR"],
-        [1, "XNOR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [6, "INPUT"],
-        [2, "NOR"],
-        [1, "XOR"],
-        [1, "XNOR"],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [6, "INPUT"],
-        [2, "AND"],
-        [1, "OR"],
-        [1, "NAND"],
-        [1, "XOR"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [5, "INPUT"],
-        [1, "NOT"],
-        [2, "XOR"],
-        [1, "NAND"],
-        [1, "NOR"],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [6, "INPUT"],
-        [2, "XOR"],
-        [1, "NAND"],
-        [1, "NOR"],
-        [1, "XNOR"],
-        [1, "OUTPUT", 1]
-    ],
-# EXTRA HARD
-    [
-        [4, "INPUT"],
-        [1, "AND"],
-        [1, "OR"],
-        [1, "NAND"],
-        [1, "XOR"],
-        [1, "OUTPUT", 0],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [3, "INPUT"],
-        [1, "NOT"],
-        [1, "AND"],
-        [1, "OR"],
-        [1, "XOR"],
-        [1, "OUTPUT", 0],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [6, "INPUT"],
-        [2, "XOR"],
-        [1, "AND"],
-        [1, "NAND"],
-        [1, "OR"],
-        [1, "OUTPUT", 1],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [4, "INPUT"],
-        [2, "NOT"],
-        [1, "NAND"],
-        [1, "NOR"],
-        [1, "XOR"],
-        [1, "OUTPUT", 1],
-        [1, "OUTPUT", 0]
-    ],
-    [
-        [6, "INPUT"],
-        [2, "NOR"],
-        [2, "XNOR"],
-        [1, "AND"],
-        [1, "OR"],
-        [2, "OUTPUT", 1]
-    ],
-    [
-        [6, "INPUT"],
-        [2, "NAND"],
-        [2, "XOR"],
-        [1, "NOR"],
-        [1, "AND"],
-        [1, "OUTPUT", 0],
-        [1, "OUTPUT", 1]
-    ],
-    [
-        [8, "INPUT"],
-        [2, "AND"],
-        [2, "OR"],
-        [1, "XOR"],
-        [1, "NAND"],
-        [1, "NOR"],
-        [1, "XNOR"],
-        [1, "OUTPUT", 1],
-        [1, "OUTPUT", 0]
-    ]
-]
-
 button_style = {'normal': UITextureButtonStyle(font_name="Roboto", font_color=arcade.color.BLACK), 'hover': UITextureButtonStyle(font_name="Roboto", font_color=arcade.color.BLACK),
                 'press': UITextureButtonStyle(font_name="Roboto", font_color=arcade.color.BLACK), 'disabled': UITextureButtonStyle(font_name="Roboto", font_color=arcade.color.BLACK)}
 big_button_style = {'normal': UITextureButtonStyle(font_name="Roboto", font_color=arcade.color.BLACK, font_size=26), 'hover': UITextureButtonStyle(font_name="Roboto", font_color=arcade.color.BLACK, font_size=26),
@@ -0,0 +1,119 @@
+import argparse, json, os, socket, struct, sys, tempfile, threading, time
+
+# A stand-in for the Discord client's IPC socket, for trying Rich Presence without Discord running. It answers the
+# handshake and SET_ACTIVITY like Discord does and prints every activity it receives. Unix sockets only.
+#   python -m utils.fake_discord --delay 2
+# Run the game with the same XDG_RUNTIME_DIR, --delay makes every reply slow like a busy Discord, --drop-after
+# closes the connection after that many updates and --rate-limit refuses updates past Discord's limit.
+
+HEADER = struct.Struct("<II") # opcode, payload length
+
+HANDSHAKE, FRAME, CLOSE = 0, 1, 2
+
+def default_directory():
+    return os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+
+class FakeDiscordServer:
+    def __init__(self, directory=None, pipe=0, delay=0.0, drop_after=None, rate_limit=False):
+        self.path = os.path.join(directory or default_directory(), f"discord-ipc-{pipe}")
+        self.delay = delay
+        self.drop_after = drop_after
+        self.rate_limit = rate_limit
+
+        self.activities = [] # (time, activity) of every update that was accepted
+        self.update_times = []
+        self.connections = 0
+        self.socket = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.bind(self.path)
+        self.socket.listen()
+
+        threading.Thread(target=self.accept, name="fake-discord", daemon=True).start()
+
+    def stop(self):
+        self.socket.close()
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def accept(self):
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except OSError: # stopped
+                return
+
+            threading.Thread(target=self.handle, args=(connection,), daemon=True).start()
+
+    def read_frame(self, connection):
+        header = connection.recv(HEADER.size, socket.MSG_WAITALL)
+        if len(header) < HEADER.size:
+            return None, None
+
+        opcode, length = HEADER.unpack(header)
+        return opcode, json.loads(connection.recv(length, socket.MSG_WAITALL))
+
+    def send_frame(self, connection, opcode, payload):
+        data = json.dumps(payload).encode("utf-8")
+        connection.sendall(HEADER.pack(opcode, len(data)) + data)
+
+    def handle(self, connection):
+        with connection:
+            opcode, payload = self.read_frame(connection)
+            if opcode != HANDSHAKE: # pypresence opens a connection just to check the socket works
+                return
+
+            self.connections += 1
+            time.sleep(self.delay)
+            self.send_frame(connection, FRAME, {"cmd": "DISPATCH", "evt": "READY", "nonce": None, "data": {"v": 1, "config": {}, "user": {"id": "0", "username": "fake"}}})
+
+            updates = 0
+
+            while True:
+                opcode, payload = self.read_frame(connection)
+                if opcode is None or opcode == CLOSE:
+                    return
+
+                time.sleep(self.delay)
+                now = time.monotonic()
+
+                if self.rate_limit and len([update_time for update_time in self.update_times if now - update_time < 20]) >= 5:
+                    self.send_frame(connection, FRAME, {"cmd": payload["cmd"], "evt": "ERROR", "nonce": payload.get("nonce"), "data": {"code": 4000, "message": "Rate limited"}})
+                    continue
+
+                self.update_times.append(now)
+                activity = payload.get("args", {}).get("activity")
+                self.activities.append((now, activity))
+                print(f"{payload['cmd']}: {json.dumps(activity)}", flush=True)
+
+                self.send_frame(connection, FRAME, {"cmd": payload["cmd"], "evt": None, "nonce": payload.get("nonce"), "data": activity})
+
+                updates += 1
+                if self.drop_after is not None and updates >= self.drop_after:
+                    return
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.fake_discord", description="Pretends to be Discord's Rich Presence IPC socket and prints every activity it receives.")
+    parser.add_argument("--directory", default=default_directory(), help="directory of the socket, pypresence looks in XDG_RUNTIME_DIR")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before every reply")
+    parser.add_argument("--drop-after", type=int, default=None, help="close each connection after this many updates")
+    parser.add_argument("--rate-limit", action="store_true", help="refuse more than 5 updates in 20 seconds")
+    args = parser.parse_args(argv)
+
+    server = FakeDiscordServer(args.directory, delay=args.delay, drop_after=args.drop_after, rate_limit=args.rate_limit)
+    server.start()
+    print(f"Listening on {server.path}", file=sys.stderr)
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import math
+
+from array import array
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def bernstein_basis(segments):
+    # the (segments + 1) x 4 cubic Bernstein weights, stored as one column per control point
+    columns = ([], [], [], [])
+
+    for i in range(segments + 1):
+        t = i / segments
+        u = 1 - t
+        columns[0].append(u * u * u)
+        columns[1].append(3 * u * u * t)
+        columns[2].append(3 * u * t * t)
+        columns[3].append(t * t * t)
+
+    return tuple(tuple(column) for column in columns)
+
+def cubic_bezier_points(p0, p1, p2, p3, segments=40):
+    b0, b1, b2, b3 = bernstein_basis(segments)
+    return [(w0 * p0[0] + w1 * p1[0] + w2 * p2[0] + w3 * p3[0], w0 * p0[1] + w1 * p1[1] + w2 * p2[1] + w3 * p3[1]) for w0, w1, w2, w3 in zip(b0, b1, b2, b3)]
+
+def cubic_bezier_buffers(curves, segments=40):
+    # evaluates every (p0, p1, p2, p3) curve in one pass, each as a float32 array of interleaved x, y
+    b0, b1, b2, b3 = bernstein_basis(segments)
+    buffers = []
+
+    for p0, p1, p2, p3 in curves:
+        x0, y0 = p0
+        x1, y1 = p1
+        x2, y2 = p2
+        x3, y3 = p3
+
+        buffer = array("f", bytes(8 * (segments + 1)))
+        buffer[0::2] = array("f", [w0 * x0 + w1 * x1 + w2 * x2 + w3 * x3 for w0, w1, w2, w3 in zip(b0, b1, b2, b3)])
+        buffer[1::2] = array("f", [w0 * y0 + w1 * y1 + w2 * y2 + w3 * y3 for w0, w1, w2, w3 in zip(b0, b1, b2, b3)])
+        buffers.append(buffer)
+
+    return buffers
+
+def get_gate_port_position(gate, port: str):
+    rect = gate.rect
+    center_y = rect.center_y
+
+    if port == "output":
+        return (rect.right, center_y)
+    else:
+        return (rect.left, center_y)
+
+def bezier_segment_count(p0, p1, p2, p3, scale=1, tolerance=0.25, max_segments=100):
+    # Wang's formula, the segments needed to stay within tolerance pixels of the curve when drawn at this scale,
+    # rounded up to a power of 2 so that wires share a few segment counts
+    flatness = max(math.hypot(p0[0] - 2 * p1[0] + p2[0], p0[1] - 2 * p1[1] + p2[1]), math.hypot(p1[0] - 2 * p2[0] + p3[0], p1[1] - 2 * p2[1] + p3[1]))
+    segments = math.ceil(math.sqrt(0.75 * flatness * scale / tolerance))
+
+    if segments <= 1:
+        return 1
+    return min(max_segments, 1 << (segments - 1).bit_length())
+
+def connection_curve(p0, p3):
+    # wires leave an output to the right and enter an input from the left
+    dx = p3[0] - p0[0]
+    offset = max(60, abs(dx) * 0.45)
+    c1 = (p0[0] + offset, p0[1])
+    c2 = (p3[0] - offset, p3[1])
+
+    return p0, c1, c2, p3
+
+def connection_points(p0, p3, segments=100):
+    return cubic_bezier_points(*connection_curve(p0, p3), segments=segments)
+
+def connection_buffers(ports, segments=100):
+    # batched connection_points for many (output port, input port) pairs at once
+    return cubic_bezier_buffers([connection_curve(p0, p3) for p0, p3 in ports], segments=segments)
+
+def point_segment_distance(px, py, x0, y0, x1, y1):
+    dx, dy = x1 - x0, y1 - y0
+    length_squared = dx * dx + dy * dy
+
+    t = ((px - x0) * dx + (py - y0) * dy) / length_squared if length_squared else 0
+    t = min(1, max(0, t))
+
+    return math.hypot(px - (x0 + t * dx), py - (y0 + t * dy))
+
+def polyline_distance(points, px, py):
+    # shortest distance from a point to a line strip of x, y interleaved points
+    return min(point_segment_distance(px, py, points[i], points[i + 1], points[i + 2], points[i + 3]) for i in range(0, len(points) - 2, 2))
+
+class SpatialHash:
+    # uniform grid over axis aligned bounds (left, bottom, right, top), each key is stored in every cell its bounds touch
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.bounds = {}
+        self.cell_ranges = {}
+
+    def cell_range(self, bounds):
+        size = self.cell_size
+        return int(bounds[0] // size), int(bounds[1] // size), int(bounds[2] // size), int(bounds[3] // size)
+
+    def insert(self, key, bounds):
+        cell_range = self.cell_range(bounds)
+        self.bounds[key] = bounds
+
+        if self.cell_ranges.get(key) == cell_range:
+            return # moved inside the same cells
+
+        self.remove_cells(key)
+        self.cell_ranges[key] = cell_range
+
+        for cx in range(cell_range[0], cell_range[2] + 1):
+            for cy in range(cell_range[1], cell_range[3] + 1):
+                self.cells.setdefault((cx, cy), set()).add(key)
+
+    def remove_cells(self, key):
+        cell_range = self.cell_ranges.pop(key, None)
+        if cell_range is None:
+            return
+
+        for cx in range(cell_range[0], cell_range[2] + 1):
+            for cy in range(cell_range[1], cell_range[3] + 1):
+                cell = self.cells[(cx, cy)]
+                cell.discard(key)
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def remove(self, key):
+        self.remove_cells(key)
+        self.bounds.pop(key, None)
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds.clear()
+        self.cell_ranges.clear()
+
+    def query_point(self, x, y):
+        # keys whose bounds contain the point, in no particular order
+        cell = self.cells.get((int(x // self.cell_size), int(y // self.cell_size)), ())
+        return [key for key in cell if self.bounds[key][0] <= x <= self.bounds[key][2] and self.bounds[key][1] <= y <= self.bounds[key][3]]
+
+    def query_rect(self, bounds):
+        # keys whose bounds overlap these bounds, in no particular order
+        left, bottom, right, top = bounds
+        x0, y0, x1, y1 = self.cell_range(bounds)
+        keys = set()
+
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            cells = (cell for (cx, cy), cell in self.cells.items() if x0 <= cx <= x1 and y0 <= cy <= y1) # zoomed far out, fewer occupied cells than cells in view
+        else:
+            cells = (self.cells[(cx, cy)] for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1) if (cx, cy) in self.cells)
+
+        for cell in cells:
+            keys.update(cell)
+
+        return [key for key in keys if self.bounds[key][0] <= right and self.bounds[key][2] >= left and self.bounds[key][1] <= top and self.bounds[key][3] >= bottom]
@@ -1,54 +1,123 @@
-import arcade.gui, arcade
+import arcade.gui, arcade, hashlib, json, os
 
-from utils.constants import LOGICAL_GATES
+from utils.constants import cache_dir, LOGICAL_GATES
 
-from PIL import ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, PngImagePlugin
 
 button_texture = arcade.gui.NinePatchTexture(64 // 4, 64 // 4, 64 // 4, 64 // 4, arcade.load_texture("assets/graphics/button.png"))
 button_hovered_texture = arcade.gui.NinePatchTexture(64 // 4, 64 // 4, 64 // 4, 64 // 4, arcade.load_texture("assets/graphics/button_hovered.png"))
 
-true_logic_gate = arcade.load_image("assets/graphics/logic_gate_true.png")
-false_logic_gate = arcade.load_image("assets/graphics/logic_gate_false.png")
+# The gate textures are rendered once into an atlas, one row per gate with its false and true state side by side,
+# and cached in cache_dir under the hash of everything they're made from. Later starts only decode the atlas, and
+# only when the first gate texture is used.
 
-true_input_logic_gate = arcade.load_image("assets/graphics/logic_gate_input_true.png")
-false_input_logic_gate = arcade.load_image("assets/graphics/logic_gate_input_false.png")
+ATLAS_VERSION = 1 # bump when the rendering below changes
 
-true_output_logic_gate = arcade.load_image("assets/graphics/logic_gate_output_true.png")
-false_output_logic_gate = arcade.load_image("assets/graphics/logic_gate_output_false.png")
+GATE_NAMES = list(LOGICAL_GATES.keys()) + ["INPUT", "OUTPUT"]
 
-logic_gate_textures = {}
+GATE_IMAGES = {
+    "INPUT": ("assets/graphics/logic_gate_input_false.png", "assets/graphics/logic_gate_input_true.png"),
+    "OUTPUT": ("assets/graphics/logic_gate_output_false.png", "assets/graphics/logic_gate_output_true.png"),
+}
+DEFAULT_GATE_IMAGES = ("assets/graphics/logic_gate_false.png", "assets/graphics/logic_gate_true.png")
+GATE_FONT = "assets/fonts/Roboto-Black.ttf"
 
-font = ImageFont.truetype("assets/fonts/Roboto-Black.ttf", 14)
+def atlas_hash():
+    content_hash = hashlib.sha256(f"{ATLAS_VERSION}\n{','.join(GATE_NAMES)}\n".encode("utf-8"))
 
-for gate_name in list(LOGICAL_GATES.keys()) + ["INPUT", "OUTPUT"]:
-    logic_gate_textures[gate_name] = []
+    for path in sorted(set(DEFAULT_GATE_IMAGES + sum(GATE_IMAGES.values(), ())) | {GATE_FONT}):
+        with open(path, "rb") as file:
+            content_hash.update(file.read())
 
-    for i in range(2):
-        if not i:
-            if gate_name == "INPUT":
-                img = false_input_logic_gate.copy()
-            elif gate_name == "OUTPUT":
-                img = false_output_logic_gate.copy()
-            else:
-                img = false_logic_gate.copy()
-        else:
-            if gate_name == "INPUT":
-                img = true_input_logic_gate.copy()
-            elif gate_name == "OUTPUT":
-                img = true_output_logic_gate.copy()
-            else:
-                img = true_logic_gate.copy()
+    return content_hash.hexdigest()[:16]
 
-        draw = ImageDraw.Draw(img)
+def render_gate_atlas():
+    # returns the atlas image and each gate's [false, true] (x, y, width, height) in it
+    font = ImageFont.truetype(GATE_FONT, 14)
+    base_images = {path: arcade.load_image(path) for path in set(DEFAULT_GATE_IMAGES + sum(GATE_IMAGES.values(), ()))}
 
-        bbox = draw.textbbox((0, 0), gate_name, font=font)
-        text_w = (bbox[2] - bbox[0]) * 1.25
-        text_h = (bbox[3] - bbox[1]) * 1.25
+    images = {}
 
-        width, height = img.size
-        text_x = (width - text_w) // 2
-        text_y = (height - text_h) // 2
+    for gate_name in GATE_NAMES:
+        images[gate_name] = []
 
-        draw.text((text_x, text_y), gate_name, font=font, fill=(0, 0, 0, 255))
+        for path in GATE_IMAGES.get(gate_name, DEFAULT_GATE_IMAGES):
+            img = base_images[path].copy()
+            draw = ImageDraw.Draw(img)
 
-        logic_gate_textures[gate_name].append(arcade.Texture(name=gate_name, image=img))
\ No newline at end of file
+            bbox = draw.textbbox((0, 0), gate_name, font=font)
+            text_w = (bbox[2] - bbox[0]) * 1.25
+            text_h = (bbox[3] - bbox[1]) * 1.25
+
+            width, height = img.size
+            text_x = (width - text_w) // 2
+            text_y = (height - text_h) // 2
+
+            draw.text((text_x, text_y), gate_name, font=font, fill=(0, 0, 0, 255))
+
+            images[gate_name].append(img)
+
+    atlas = Image.new("RGBA", (max(sum(img.width for img in row) for row in images.values()), sum(row[0].height for row in images.values())))
+    layout = {}
+    y = 0
+
+    for gate_name, row in images.items():
+        layout[gate_name] = []
+        x = 0
+
+        for img in row:
+            atlas.paste(img, (x, y))
+            layout[gate_name].append((x, y, img.width, img.height))
+            x += img.width
+
+        y += row[0].height
+
+    return atlas, layout
+
+def load_gate_atlas():
+    path = os.path.join(cache_dir, f"gate_atlas-{atlas_hash()}.png")
+
+    if os.path.exists(path):
+        try:
+            with Image.open(path) as atlas:
+                atlas.load()
+                return atlas.convert("RGBA"), json.loads(atlas.text["layout"])
+        except (OSError, ValueError, KeyError):
+            pass # a broken cache is rendered again
+
+    atlas, layout = render_gate_atlas()
+
+    info = PngImagePlugin.PngInfo()
+    info.add_text("layout", json.dumps(layout))
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        atlas.save(path + ".tmp", format="PNG", pnginfo=info)
+        os.replace(path + ".tmp", path)
+
+        for file_name in os.listdir(cache_dir): # atlases of older assets
+            if file_name.startswith("gate_atlas-") and file_name != os.path.basename(path):
+                os.remove(os.path.join(cache_dir, file_name))
+    except OSError:
+        pass # a read-only install renders the atlas every start
+
+    return atlas, layout
+
+class GateTextures(dict):
+    # gate type -> [false texture, true texture], the atlas is only loaded by the first lookup
+    def __init__(self):
+        super().__init__()
+        self.atlas = None
+
+    def __missing__(self, gate_name):
+        if self.atlas is None:
+            self.atlas, self.layout = load_gate_atlas()
+
+        self[gate_name] = [
+            arcade.Texture(self.atlas.crop((x, y, x + width, y + height)), hash=f"logic_gate_{gate_name}_{state}")
+            for state, (x, y, width, height) in enumerate(self.layout[gate_name])
+        ]
+
+        return self[gate_name]
+
+logic_gate_textures = GateTextures()
@@ -0,0 +1,113 @@
+import logging, threading, time
+
+from collections import deque
+
+RATE_LIMIT_UPDATES = 5 # Discord accepts 5 activity updates every 20 seconds
+RATE_LIMIT_PERIOD = 20.0
+RECONNECT_DELAYS = (5, 10, 30, 60) # seconds before each reconnect attempt, the last one repeats
+
+class PresenceClient():
+    # Discord Rich Presence on its own thread, so connecting, reconnecting and updating never wait on the UI thread.
+    # update only keeps the latest activity, one that wasn't sent yet is replaced by the next, and sending waits for
+    # the rate limit instead of getting dropped by Discord.
+    def __init__(self, client_id, start_time, pipe=None):
+        self.client_id = client_id
+        self.start_time = start_time
+        self.pipe = pipe
+
+        self.pending = deque(maxlen=1)
+        self.condition = threading.Condition()
+        self.closing = False
+        self.sent_times = deque(maxlen=RATE_LIMIT_UPDATES)
+        self.connected = False
+
+        self.thread = threading.Thread(target=self.run, name="presence", daemon=True)
+
+    def start(self):
+        # pypresence is imported on the worker thread, so this is cheap. starting it again does nothing
+        if self.thread.ident is None:
+            self.thread.start()
+
+    def update(self, **activity):
+        with self.condition:
+            self.pending.append(activity)
+            self.condition.notify()
+
+    def close(self):
+        # the worker clears the activity and disconnects, this doesn't wait for it
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+
+    def wait(self, until):
+        # waits until there's an activity to send and it's past until, returns False once closing
+        with self.condition:
+            while not self.closing and (not self.pending or time.monotonic() < until):
+                self.condition.wait(until - time.monotonic() if self.pending else None)
+
+            return not self.closing
+
+    def rate_limit_time(self):
+        if len(self.sent_times) < RATE_LIMIT_UPDATES:
+            return 0
+
+        return self.sent_times[0] + RATE_LIMIT_PERIOD
+
+    def run(self):
+        import asyncio, pypresence
+
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+        presence = None
+        attempt = 0
+        until = 0
+
+        while self.wait(until):
+            if presence is None:
+                try:
+                    presence = pypresence.Presence(self.client_id, pipe=self.pipe, connection_timeout=5, response_timeout=5)
+                    presence.connect()
+                except Exception as e:
+                    logging.debug(f"Couldn't connect to Discord: {e!r}")
+                    presence = None
+                    until = time.monotonic() + RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+                    attempt += 1
+                    continue
+
+                logging.info("Connected to Discord")
+                attempt = 0
+                self.connected = True
+
+            until = self.rate_limit_time()
+            if time.monotonic() < until:
+                continue
+
+            with self.condition:
+                activity = self.pending.popleft()
+
+            try:
+                presence.update(**activity)
+            except pypresence.ServerError as e: # Discord refused it, most likely rate limited by other clients
+                logging.debug(f"Discord refused a presence update: {e!r}")
+                until = time.monotonic() + RATE_LIMIT_PERIOD
+            except Exception as e:
+                logging.info(f"Lost connection to Discord: {e!r}")
+                presence = None
+                self.connected = False
+                until = time.monotonic() + RECONNECT_DELAYS[0]
+            else:
+                self.sent_times.append(time.monotonic())
+                continue
+
+            with self.condition: # send it again, unless a newer one came in meanwhile
+                if not self.pending:
+                    self.pending.append(activity)
+
+        if presence is not None:
+            try:
+                presence.clear()
+                presence.close()
+            except Exception:
+                pass
+
+        self.connected = False
@@ -1,16 +1,8 @@
-import logging, arcade, traceback, pyglet.display
+import logging, arcade, traceback, time, pyglet.display
 from utils.constants import menu_background_color
 
 import pyglet.display
 
-def multi_gate(values, func):
-    value = values[0]
-
-    for new_value in values[1:]:
-        value = func(value, new_value)
-
-    return value
-
 def generate_task_text(level):
     text = "Task: You need to use "
 
@@ -19,24 +11,6 @@ def generate_task_text(level):
 
     return text
 
-def cubic_bezier_point(p0, p1, p2, p3, t):
-    u = 1 - t
-    x = (u ** 3) * p0[0] + 3 * (u ** 2) * t * p1[0] + 3 * u * (t ** 2) * p2[0] + (t ** 3) * p3[0]
-    y = (u ** 3) * p0[1] + 3 * (u ** 2) * t * p1[1] + 3 * u * (t ** 2) * p2[1] + (t ** 3) * p3[1]
-    return x, y
-
-def cubic_bezier_points(p0, p1, p2, p3, segments=40):
-    return [cubic_bezier_point(p0, p1, p2, p3, i / segments) for i in range(segments + 1)]
-
-def get_gate_port_position(gate, port: str):
-    rect = gate.rect
-    center_y = rect.center_y
-
-    if port == "output":
-        return (rect.right, center_y)
-    else:
-        return (rect.left, center_y)
-
 def dump_platform():
     import platform
     logging.debug(f'Platform: {platform.platform()}')
@@ -91,9 +65,33 @@ def get_closest_resolution():
         )
     return closest_resolution
 
+class StartupTimer():
+    # times the phases of starting the game, each mark ends the phase that started at the previous one
+    def __init__(self, start):
+        self.start = self.last = start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        phases = ", ".join(f"{phase} {duration * 1000:.0f} ms" for phase, duration in self.phases)
+        logging.info(f"Startup took {(self.last - self.start) * 1000:.0f} ms: {phases}")
+
+    def report_after_first_frame(self, window):
+        def on_draw():
+            window.remove_handler("on_draw", on_draw)
+            arcade.schedule_once(lambda delta_time: (self.mark("first frame"), self.report()), 0) # once the frame is on screen
+
+        window.push_handlers(on_draw=on_draw)
+
 class FakePyPresence():
     def __init__(self):
         ...
+    def start(self, *args, **kwargs):
+        ...
     def update(self, *args, **kwargs):
         ...
     def close(self, *args, **kwargs):